@@ -0,0 +1,85 @@
+import argparse
+import sys
+from typing import List, Optional
+
+from benchmark.memory import measure_registrations, format_memory
+from benchmark.runner import run, dump, load, compare, format_results
+from benchmark.scaling import SIZES, make_scaling_scenarios, format_curves
+from benchmark.scenarios import SCENARIOS
+
+
+def run_command(args: argparse.Namespace) -> int:
+    scenarios = [scenario for scenario in SCENARIOS if args.filter is None or args.filter in scenario.name]
+    if not scenarios:
+        print(f"No scenarios match {args.filter!r}", file=sys.stderr)
+        return 1
+
+    results = run(scenarios, repeat=args.repeat, warmup=args.warmup)
+    print(format_results(results))
+    if args.output is not None:
+        dump(results, args.output)
+    return 0
+
+
+def scaling_command(args: argparse.Namespace) -> int:
+    results = run(make_scaling_scenarios(args.sizes), repeat=args.repeat, warmup=args.warmup)
+    print(format_curves(results, args.sizes))
+    if args.output is not None:
+        dump(results, args.output)
+    return 0
+
+
+def memory_command(args: argparse.Namespace) -> int:
+    print(format_memory(measure_registrations(args.number)))
+    return 0
+
+
+def compare_command(args: argparse.Namespace) -> int:
+    regressions = compare(load(args.base), load(args.current), threshold=args.threshold)
+    for regression in regressions:
+        print(f"{regression.name}: {regression.base:,.0f} -> {regression.current:,.0f} ops/s ({regression.change:+.1%})")
+    if regressions:
+        return 1
+    print("No regressions")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description="pyject benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run benchmark scenarios")
+    run_parser.add_argument("-k", "--filter", help="run only scenarios whose name contains the substring")
+    run_parser.add_argument("-r", "--repeat", type=int, default=5, help="measured repetitions of each scenario")
+    run_parser.add_argument("-w", "--warmup", type=int, default=1, help="unmeasured repetitions before measuring")
+    run_parser.add_argument("-o", "--output", help="write results to a JSON file")
+    run_parser.set_defaults(handler=run_command)
+
+    scaling_parser = subparsers.add_parser("scaling", help="run operations on registries of growing size")
+    scaling_parser.add_argument(
+        "-s", "--sizes", type=lambda sizes: [int(size) for size in sizes.split(",")], default=list(SIZES),
+        help="comma separated registry sizes"
+    )
+    scaling_parser.add_argument("-r", "--repeat", type=int, default=3, help="measured repetitions of each scenario")
+    scaling_parser.add_argument("-w", "--warmup", type=int, default=1, help="unmeasured repetitions before measuring")
+    scaling_parser.add_argument("-o", "--output", help="write results to a JSON file")
+    scaling_parser.set_defaults(handler=scaling_command)
+
+    memory_parser = subparsers.add_parser("memory", help="measure memory allocated per registration")
+    memory_parser.add_argument("-n", "--number", type=int, default=10000, help="registrations of each kind")
+    memory_parser.set_defaults(handler=memory_command)
+
+    compare_parser = subparsers.add_parser("compare", help="find regressions between two JSON result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "-t", "--threshold", type=float, default=0.1, help="relative drop of median ops/s that counts as a regression"
+    )
+    compare_parser.set_defaults(handler=compare_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+from abc import ABC, abstractmethod
+from typing import Any, Generic, List, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class DuckInterface(ABC):
+    @abstractmethod
+    def quack(self):
+        raise NotImplementedError()
+
+
+class QuackBehavior(ABC):
+    @abstractmethod
+    def quack(self):
+        raise NotImplementedError()
+
+
+class Sqeak(QuackBehavior):
+    def quack(self):
+        pass
+
+
+class DuckA(DuckInterface):
+    def __init__(self, squeak: QuackBehavior):
+        self._quack_behavior = squeak
+
+    def quack(self):
+        self._quack_behavior.quack()
+
+
+class DuckC(DuckInterface):
+    def quack(self):
+        pass
+
+
+class MissingInterface(ABC):
+    pass
+
+
+class Repository(Generic[T]):
+    pass
+
+
+class DuckRepository(Repository[DuckInterface]):
+    def __init__(self, squeak: QuackBehavior):
+        self._quack_behavior = squeak
+
+
+def make_implementations(count: int) -> List[Type[DuckInterface]]:
+    """Make distinct DuckInterface implementations, so that signatures are parsed for each of them"""
+    implementations = []
+    for _ in range(count):
+        class Duck(DuckInterface):
+            def __init__(self, squeak: QuackBehavior):
+                self._quack_behavior = squeak
+
+            def quack(self):
+                self._quack_behavior.quack()
+
+        implementations.append(Duck)
+    return implementations
+
+
+def make_chain(depth: int) -> List[type]:
+    """Make classes where each one depends on the previous one"""
+    classes: List[type] = []
+    for index in range(depth):
+        annotations = {"dependency": classes[-1]} if classes else {}
+
+        def __init__(self, **dependencies: Any) -> None:
+            self.__dict__.update(dependencies)
+
+        __init__.__annotations__ = annotations
+        classes.append(type(f"Node{index}", (), {"__init__": __init__}))
+    return classes
+
+
+def make_wide(width: int) -> List[type]:
+    """Make leaf classes and a last class that depends on all of them"""
+    leaves = [type(f"Leaf{index}", (), {}) for index in range(width)]
+
+    def __init__(self, **dependencies: Any) -> None:
+        self.__dict__.update(dependencies)
+
+    __init__.__annotations__ = {f"leaf{index}": leaf for index, leaf in enumerate(leaves)}
+    return leaves + [type("Root", (), {"__init__": __init__})]
@@ -0,0 +1,55 @@
+import gc
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from pyject import Container
+
+from benchmark.classes import DuckInterface, QuackBehavior, Sqeak, make_implementations
+
+
+def measure(register: Callable[[Container, Any], None], number: int) -> float:
+    # distinct implementations, so that the per-implementation signature cache is measured as well
+    implementations = make_implementations(number)
+    gc.collect()
+    tracemalloc.start()
+    container = Container()
+    container.add_singleton(QuackBehavior, Sqeak)
+    start, _ = tracemalloc.get_traced_memory()
+    for implementation in implementations:
+        register(container, implementation)
+    gc.collect()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (end - start) / number
+
+
+def register_transient(container: Container, implementation: Any) -> None:
+    container.add_transient(DuckInterface, implementation)
+
+
+def register_singleton(container: Container, implementation: Any) -> None:
+    container.add_singleton(DuckInterface, implementation)
+
+
+def register_constant(container: Container, implementation: Any) -> None:
+    container.add_constant(DuckInterface, implementation.__new__(implementation))
+
+
+REGISTRATIONS = {
+    "transient": register_transient,
+    "singleton": register_singleton,
+    "constant": register_constant,
+}
+
+
+def measure_registrations(number: int = 10000) -> Dict[str, float]:
+    """Bytes allocated per registration of each kind"""
+    return {kind: measure(register, number) for kind, register in REGISTRATIONS.items()}
+
+
+def format_memory(results: Dict[str, float]) -> str:
+    return "\n".join(f"bytes per {kind} registration {size:,.0f}" for kind, size in results.items())
+
+
+if __name__ == "__main__":
+    print(format_memory(measure_registrations()))
@@ -0,0 +1,102 @@
+import json
+import platform
+import statistics
+from dataclasses import dataclass, asdict
+from timeit import Timer
+from typing import Any, Dict, List, Optional, Iterable
+
+import pyject
+
+from benchmark.scenarios import Scenario
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    number: int
+    samples: List[float]
+    mean: float
+    median: float
+    stdev: float
+    min: float
+    max: float
+
+
+@dataclass
+class Regression:
+    name: str
+    base: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.base - 1
+
+
+def run_scenario(scenario: Scenario, repeat: int = 5, warmup: int = 1) -> BenchmarkResult:
+    """Measure operations per second of scenario, each repetition on a freshly set up statement"""
+    for _ in range(warmup):
+        Timer(scenario.setup()).timeit(number=scenario.number)
+
+    samples = []
+    for _ in range(repeat):
+        seconds = Timer(scenario.setup()).timeit(number=scenario.number)
+        samples.append(scenario.number / seconds)
+
+    return BenchmarkResult(
+        name=scenario.name,
+        number=scenario.number,
+        samples=samples,
+        mean=statistics.mean(samples),
+        median=statistics.median(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        min=min(samples),
+        max=max(samples),
+    )
+
+
+def run(scenarios: Iterable[Scenario], repeat: int = 5, warmup: int = 1) -> List[BenchmarkResult]:
+    return [run_scenario(scenario, repeat, warmup) for scenario in scenarios]
+
+
+def get_environment() -> Dict[str, Any]:
+    return {
+        "pyject": pyject.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+    }
+
+
+def dump(results: List[BenchmarkResult], path: str) -> None:
+    with open(path, "w", encoding="utf8") as f:
+        json.dump({"environment": get_environment(), "results": [asdict(result) for result in results]}, f, indent=2)
+
+
+def load(path: str) -> List[BenchmarkResult]:
+    with open(path, encoding="utf8") as f:
+        return [BenchmarkResult(**result) for result in json.load(f)["results"]]
+
+
+def compare(
+    base: List[BenchmarkResult], current: List[BenchmarkResult], threshold: float = 0.1
+) -> List[Regression]:
+    """Get scenarios whose median throughput dropped by more than threshold"""
+    base_results = {result.name: result for result in base}
+    regressions = []
+    for result in current:
+        base_result: Optional[BenchmarkResult] = base_results.get(result.name, None)
+        if base_result is None:
+            continue
+        if result.median < base_result.median * (1 - threshold):
+            regressions.append(Regression(name=result.name, base=base_result.median, current=result.median))
+    return regressions
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    width = max(len(result.name) for result in results)
+    lines = [f"{'scenario':<{width}}  {'median ops/s':>14}  {'mean ops/s':>14}  {'stdev':>7}"]
+    for result in results:
+        stdev = result.stdev / result.mean if result.mean else 0.0
+        lines.append(f"{result.name:<{width}}  {result.median:>14,.0f}  {result.mean:>14,.0f}  {stdev:>6.1%}")
+    return "\n".join(lines)
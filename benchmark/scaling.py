@@ -0,0 +1,105 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+from pyject import Container
+
+from benchmark.classes import DuckInterface, QuackBehavior, Sqeak, DuckA, DuckC
+from benchmark.runner import BenchmarkResult
+from benchmark.scenarios import Scenario, Statement, OptionalConsumer
+
+SIZES = (10, 100, 1000, 10000, 100000)
+OPERATIONS = ("get", "get_all", "Optional miss", "override", "override with clear_cache")
+
+
+def make_service(index: int) -> Tuple[type, type]:
+    """Make a leaf class and a service class that depends on it"""
+    leaf = type(f"Leaf{index}", (), {})
+
+    def __init__(self, leaf: Any) -> None:
+        self.leaf = leaf
+
+    __init__.__annotations__ = {"leaf": leaf}
+    return leaf, type(f"Service{index}", (), {"__init__": __init__})
+
+
+def setup_registry(size: int) -> Container:
+    """Container with size unrelated services depending on their own leaves besides the benchmarked ones"""
+    container = Container()
+    for index in range(size):
+        # each service adds its own entry to the index of dependents, so overrides have to find theirs in it
+        leaf, service = make_service(index)
+        container.add_singleton(leaf)
+        container.add_singleton(service)
+    container.add_singleton(QuackBehavior, Sqeak)
+    container.add_transient(DuckInterface, DuckA)
+    container.add_transient(DuckInterface, DuckC)
+    container.add_transient(OptionalConsumer)
+    return container
+
+
+def primed(statement: Statement) -> Statement:
+    # the first call compiles resolution plans, which is registration cost rather than lookup cost
+    statement()
+    return statement
+
+
+def get_statement(size: int) -> Statement:
+    container = setup_registry(size)
+    return primed(lambda: container.get(DuckInterface))
+
+
+def get_all_statement(size: int) -> Statement:
+    container = setup_registry(size)
+    return primed(lambda: container.get_all(DuckInterface))
+
+
+def optional_miss_statement(size: int) -> Statement:
+    container = setup_registry(size)
+    return primed(lambda: container.get(OptionalConsumer))
+
+
+def override_statement(size: int, is_clear_cache: bool) -> Statement:
+    container = setup_registry(size)
+    duck = DuckC()
+
+    def statement() -> None:
+        with container.override(DuckInterface, duck, is_clear_cache=is_clear_cache):
+            container.get(DuckInterface)
+
+    return primed(statement)
+
+
+def get_name(operation: str, size: int) -> str:
+    return f"{operation} @ {size}"
+
+
+def make_scaling_scenarios(sizes: Sequence[int] = SIZES) -> List[Scenario]:
+    scenarios = []
+    for size in sizes:
+        # operations that may be linear in the registry size get fewer calls on big registries
+        number = max(1, min(1000, 1000000 // size))
+        scenarios.extend([
+            Scenario(get_name("get", size), lambda size=size: get_statement(size)),
+            Scenario(get_name("get_all", size), lambda size=size: get_all_statement(size)),
+            Scenario(get_name("Optional miss", size), lambda size=size: optional_miss_statement(size)),
+            Scenario(get_name("override", size), lambda size=size: override_statement(size, False), number=number),
+            Scenario(
+                get_name("override with clear_cache", size),
+                lambda size=size: override_statement(size, True),
+                number=number
+            ),
+        ])
+    return scenarios
+
+
+def format_curves(results: List[BenchmarkResult], sizes: Sequence[int]) -> str:
+    """Table of median operations per second with an operation per row and a registry size per column"""
+    medians: Dict[str, float] = {result.name: result.median for result in results}
+    width = max(len(operation) for operation in OPERATIONS)
+    lines = [f"{'operation':<{width}}" + "".join(f"{size:>14}" for size in sizes)]
+    for operation in OPERATIONS:
+        cells = []
+        for size in sizes:
+            median = medians.get(get_name(operation, size), None)
+            cells.append(f"{'-' if median is None else f'{median:,.0f}':>14}")
+        lines.append(f"{operation:<{width}}" + "".join(cells))
+    return "\n".join(lines)
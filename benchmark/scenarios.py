@@ -0,0 +1,207 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, List, Optional, Union
+
+from pyject import Container, ForwardRef, Provider, unwrap
+
+from benchmark.classes import DuckInterface, QuackBehavior, Sqeak, DuckA, DuckC, MissingInterface, Repository, \
+    DuckRepository, make_implementations, make_chain, make_wide
+
+Statement = Callable[[], Any]
+
+
+@dataclass
+class Scenario:
+    name: str
+    setup: Callable[[], Statement]
+    number: int = 1000
+
+
+class UnionConsumer:
+    def __init__(self, duck: Union[MissingInterface, DuckInterface]):
+        self.duck = duck
+
+
+class OptionalConsumer:
+    def __init__(self, missing: Optional[MissingInterface]):
+        self.missing = missing
+
+
+class ListConsumer:
+    def __init__(self, ducks: List[DuckInterface]):
+        self.ducks = ducks
+
+
+class IteratorConsumer:
+    def __init__(self, ducks: Iterator[DuckInterface]):
+        self.ducks = ducks
+
+
+class ForwardRefConsumer:
+    def __init__(self, duck: ForwardRef[DuckInterface]):
+        self.duck = duck
+
+
+class ProviderConsumer:
+    def __init__(self, create_duck: Provider[DuckInterface]):
+        self.create_duck = create_duck
+
+
+def setup_transient() -> Container:
+    container = Container()
+    container.add_transient(QuackBehavior, Sqeak)
+    container.add_transient(DuckInterface, DuckA)
+    container.add_transient(DuckInterface, DuckC)
+    return container
+
+
+def setup_singleton() -> Container:
+    container = Container()
+    container.add_singleton(QuackBehavior, Sqeak)
+    container.add_singleton(DuckInterface, DuckA)
+    container.add_singleton(DuckInterface, DuckC)
+    return container
+
+
+def setup_context() -> Container:
+    container = Container()
+    container.add_context(QuackBehavior, Sqeak)
+    container.add_context(DuckInterface, DuckA)
+    container.add_context(DuckInterface, DuckC)
+    return container
+
+
+def setup_generic() -> Container:
+    container = Container()
+    container.add_singleton(QuackBehavior, Sqeak)
+    container.add_transient(Repository[DuckInterface], DuckRepository)
+    return container
+
+
+def setup_big_transient() -> Container:
+    container = Container()
+    container.add_transient(QuackBehavior, Sqeak)
+    for _ in range(20):
+        container.add_transient(DuckInterface, DuckA)
+    for _ in range(20):
+        container.add_transient(DuckInterface, DuckC)
+    return container
+
+
+def get_statement(container: Container, method: str, annotation: Any) -> Statement:
+    get = getattr(container, method)
+    return lambda: get(annotation)
+
+
+def first_statement(container: Container, annotation: Any) -> Statement:
+    return lambda: next(container.iter_all(annotation))
+
+
+def scope_statement(container: Container) -> Statement:
+    def statement() -> None:
+        with container.scope():
+            container.get(DuckInterface)
+            container.get(DuckInterface)
+
+    return statement
+
+
+def graph_statement(classes: List[type], scope: str, is_codegen: bool = False) -> Statement:
+    container = Container()
+    add = getattr(container, f"add_{scope}")
+    for class_ in classes:
+        add(class_)
+    container.enable_codegen(is_codegen)
+    return get_statement(container, "get", classes[-1])
+
+
+def codegen_statement() -> Statement:
+    container = setup_transient()
+    container.enable_codegen()
+    return get_statement(container, "get", DuckInterface)
+
+
+def consumer_statement(consumer: type) -> Statement:
+    container = setup_transient()
+    container.add_transient(consumer)
+    return get_statement(container, "get", consumer)
+
+
+def forward_ref_statement(is_unwrapped: bool) -> Statement:
+    container = setup_transient()
+    container.add_transient(ForwardRefConsumer)
+    duck = container.get(ForwardRefConsumer).duck
+    duck.quack()
+    if is_unwrapped:
+        duck = unwrap(duck)
+    return lambda: duck.quack()
+
+
+def provider_statement(is_kwargs: bool) -> Statement:
+    container = setup_transient()
+    container.add_transient(ProviderConsumer)
+    create_duck = container.get(ProviderConsumer).create_duck
+    if is_kwargs:
+        squeak = Sqeak()
+        return lambda: create_duck(squeak=squeak)
+    return create_duck
+
+
+def resolve_statement() -> Statement:
+    container = setup_transient()
+    return lambda: container.resolve(DuckA)
+
+
+def override_statement() -> Statement:
+    container = setup_singleton()
+    duck = DuckC()
+
+    def statement() -> None:
+        with container.override(DuckInterface, duck):
+            container.get(DuckInterface)
+
+    return statement
+
+
+def registration_statement(is_lazy: bool) -> Statement:
+    implementations = make_implementations(1000)
+    container = Container(is_lazy=is_lazy)
+
+    def statement() -> None:
+        for implementation in implementations:
+            container.add_transient(DuckInterface, implementation)
+
+    return statement
+
+
+SCENARIOS = [
+    Scenario("get transient", lambda: get_statement(setup_transient(), "get", DuckInterface)),
+    Scenario("get_all transient", lambda: get_statement(setup_transient(), "get_all", DuckInterface)),
+    Scenario("get singleton", lambda: get_statement(setup_singleton(), "get", DuckInterface)),
+    Scenario("get_all singleton", lambda: get_statement(setup_singleton(), "get_all", DuckInterface)),
+    Scenario("get context", lambda: get_statement(setup_context(), "get", DuckInterface)),
+    Scenario("get context in new scope", lambda: scope_statement(setup_context())),
+    Scenario("get_all big_transient", lambda: get_statement(setup_big_transient(), "get_all", DuckInterface)),
+    Scenario("iter_all big_transient first", lambda: first_statement(setup_big_transient(), DuckInterface)),
+    Scenario("get generic transient", lambda: get_statement(setup_generic(), "get", Repository[DuckInterface])),
+    Scenario("get frozen transient", lambda: get_statement(setup_transient().freeze(), "get", DuckInterface)),
+    Scenario("get frozen singleton", lambda: get_statement(setup_singleton().freeze(), "get", DuckInterface)),
+    Scenario("get deep transient graph", lambda: graph_statement(make_chain(20), "transient")),
+    Scenario("get deep singleton graph", lambda: graph_statement(make_chain(20), "singleton")),
+    Scenario("get wide transient graph", lambda: graph_statement(make_wide(20), "transient")),
+    Scenario("get transient codegen", codegen_statement),
+    Scenario("get deep transient graph codegen", lambda: graph_statement(make_chain(20), "transient", True)),
+    Scenario("get wide transient graph codegen", lambda: graph_statement(make_wide(20), "transient", True)),
+    Scenario("get Union parameter", lambda: consumer_statement(UnionConsumer)),
+    Scenario("get Optional parameter miss", lambda: consumer_statement(OptionalConsumer)),
+    Scenario("get List parameter", lambda: consumer_statement(ListConsumer)),
+    Scenario("get Iterator parameter", lambda: consumer_statement(IteratorConsumer)),
+    Scenario("get ForwardRef parameter", lambda: consumer_statement(ForwardRefConsumer)),
+    Scenario("ForwardRef method call", lambda: forward_ref_statement(is_unwrapped=False), number=100000),
+    Scenario("ForwardRef unwrapped method call", lambda: forward_ref_statement(is_unwrapped=True), number=100000),
+    Scenario("Provider call", lambda: provider_statement(is_kwargs=False), number=100000),
+    Scenario("Provider call with kwargs", lambda: provider_statement(is_kwargs=True), number=100000),
+    Scenario("resolve transient", resolve_statement),
+    Scenario("override singleton", override_statement),
+    Scenario("add_transient x1000 eager", lambda: registration_statement(is_lazy=False), number=1),
+    Scenario("add_transient x1000 lazy", lambda: registration_statement(is_lazy=True), number=1),
+]
@@ -1,8 +1,9 @@
 __version__ = "0.2.0"
 
-from pyject.container import Container
-from pyject.models import Scope
-from pyject.exception import DependencyNotFound, DependencyResolvingException
+from pyject.container import Container, FrozenContainer, ChildContainer, inject
+from pyject.scope import DependencyScope
+from pyject.models import Scope, LazyImport
+from pyject.exception import DependencyNotFound, DependencyResolvingException, ContainerFrozenException
 from pyject.base import IContainer
 from pyject.base import IContainer as BaseContainer
-from pyject.types import ForwardRef
+from pyject.types import ForwardRef, Provider, unwrap
@@ -1,5 +1,8 @@
 import inspect
 from typing import Any, get_type_hints, Dict, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from pyject.utils import get_typing_args
 
 
 def get_annotations(implementation: Any) -> Dict[str, Any]:
@@ -33,3 +36,87 @@ def get_annotations_to_implementation(implementation: Any) -> Optional[Tuple[Tup
     else:
         return None
     return convert_dict_annotation_to_tuple(annotations)
+
+
+class SignatureCache:
+    """Weak-keyed cache of parsed implementation signatures"""
+
+    def __init__(self, maxsize: Optional[int] = None) -> None:
+        self._cache: "WeakKeyDictionary[Any, Optional[Tuple[Tuple[str, Any]]]]" = WeakKeyDictionary()
+        self._maxsize = maxsize
+
+    @property
+    def maxsize(self) -> Optional[int]:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: Optional[int]) -> None:
+        self._maxsize = value
+        self._shrink()
+
+    def get(self, implementation: Any) -> Optional[Tuple[Tuple[str, Any]]]:
+        """Get annotations to implementation, parsing them only on the first call"""
+        if inspect.ismethod(implementation):
+            key = implementation.__func__
+        elif inspect.isclass(implementation) or inspect.isfunction(implementation):
+            key = implementation
+        else:
+            # instances are mostly registered once, so caching them would only cost memory
+            return get_annotations_to_implementation(implementation)
+
+        try:
+            return self._cache[key]
+        except KeyError:
+            annotations = get_annotations_to_implementation(implementation)
+            self._cache[key] = annotations
+            self._shrink()
+            return annotations
+        except TypeError:
+            return get_annotations_to_implementation(implementation)
+
+    def clear(self) -> None:
+        """Clear cached signatures"""
+        self._cache.clear()
+
+    def _shrink(self) -> None:
+        if self._maxsize is None:
+            return
+        while len(self._cache) > self._maxsize:
+            del self._cache[next(iter(self._cache))]
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class AnnotationKeyCache:
+    """Weak-keyed cache of keys under which dependencies of annotations are stored"""
+
+    def __init__(self) -> None:
+        # type arguments are cached rather than keys, which would keep their annotations alive
+        self._cache: "WeakKeyDictionary[Any, Tuple[Any, ...]]" = WeakKeyDictionary()
+
+    def get(self, annotation: Any) -> Any:
+        """Get the annotation or, for generics, a tuple of it and its type arguments"""
+        if annotation.__class__ is type:
+            return annotation
+        try:
+            type_args = self._cache.get(annotation, None)
+            if type_args is None:
+                type_args = get_typing_args(annotation)
+                self._cache[annotation] = type_args
+        except TypeError:
+            type_args = get_typing_args(annotation)
+        if type_args:
+            return annotation, type_args
+        return annotation
+
+    def clear(self) -> None:
+        """Clear cached keys"""
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+signature_cache = SignatureCache()
+annotation_keys = AnnotationKeyCache()
@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
+from functools import partial
 from typing import Type, TypeVar, List, Any, Dict, Optional, Union, Iterator, overload, Callable, Awaitable, Tuple
 
-from pyject.models import Scope
+from pyject.models import Scope, WarmupTiming, DependencyStats
+from pyject.plan import ResolutionPlan, AsyncResolutionPlan
+from pyject.scope import DependencyScope
 
 T = TypeVar("T")
 
@@ -28,8 +31,12 @@ class IContainer(ABC):
         """Get object from container"""
 
     @abstractmethod
-    def get_all(self, annotation: Type[T]) -> List[T]:
-        """Get all object from container"""
+    def get_all(self, annotation: Type[T], limit: Optional[int] = None) -> List[T]:
+        """Get all object from container, or only the first limit of them"""
+
+    def iter_all(self, annotation: Type[T]) -> Iterator[T]:
+        """Get iterator that creates objects from container one by one as they are consumed"""
+        raise NotImplementedError()
 
     @abstractmethod
     def get_target_attributes(self, target: Any) -> Optional[Dict[str, Any]]:
@@ -51,6 +58,58 @@ class IContainer(ABC):
     async def async_resolve(self, target: Callable[..., Awaitable[T]]) -> T:
         ...
 
+    async def async_get(self, annotation: Type[T]) -> T:
+        """Get object from container resolving asynchronous dependencies"""
+        raise NotImplementedError()
+
+    async def async_get_all(self, annotation: Type[T], limit: Optional[int] = None) -> List[T]:
+        """Get all object from container, or only the first limit of them, resolving asynchronous dependencies"""
+        raise NotImplementedError()
+
+    def warmup(self, max_workers: Optional[int] = None) -> List[WarmupTiming]:
+        """Create all synchronous singletons in dependency order, independent ones in parallel threads"""
+        raise NotImplementedError()
+
+    async def async_warmup(self) -> List[WarmupTiming]:
+        """Create all singletons in dependency order, independent ones concurrently"""
+        raise NotImplementedError()
+
+    def inject(self, target: Callable[..., T]) -> Callable[..., T]:
+        """Decorator that resolves arguments not passed by the caller from the container"""
+        raise NotImplementedError()
+
+    def scope(self) -> DependencyScope:
+        """Context manager in which context scoped dependencies are created once and released on exit"""
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Finalize resources created outside of scopes and drop singletons"""
+        raise NotImplementedError()
+
+    async def aclose(self) -> None:
+        """Finalize synchronous and asynchronous resources created outside of scopes and drop singletons"""
+        raise NotImplementedError()
+
+    def enable_stats(self, is_enabled: bool = True) -> None:
+        """Record count, time and cache hits of each dependency resolution"""
+        raise NotImplementedError()
+
+    def stats(self) -> List[DependencyStats]:
+        """Get snapshot of resolution statistics recorded since they were enabled"""
+        raise NotImplementedError()
+
+    def enable_codegen(self, is_enabled: bool = True) -> None:
+        """Create transients with generated Python functions calling constructors of their dependencies directly"""
+        raise NotImplementedError()
+
+    def get_source(self, annotation: Any) -> Optional[str]:
+        """Get generated source of the function that creates the first dependency of annotation"""
+        raise NotImplementedError()
+
+    def create_child(self) -> "IContainer":
+        """Get a container that inherits dependencies and singletons, and can add or replace dependencies"""
+        raise NotImplementedError()
+
 
 class IResolver(ABC):
     @abstractmethod
@@ -61,6 +120,26 @@ class IResolver(ABC):
     def get_resolved_dependencies(self, typing: Any) -> Iterator[Any]:
         """An iterator that returns resolved dependencies"""
 
+    def get_plan(self, typing: Any) -> "ResolutionPlan":
+        """Get compiled resolution plan for typing"""
+        raise NotImplementedError()
+
+    def get_factory(self, typing: Any) -> Callable[[Dict[str, Any]], Any]:
+        """Get callable creating the first dependency for typing, with passed keyword arguments replacing resolved ones"""
+        raise NotImplementedError()
+
+    def create_scope(self) -> DependencyScope:
+        """Create scope that holds context scoped dependencies until it is exited"""
+        raise NotImplementedError()
+
+    def get_async_plan(self, typing: Any) -> "AsyncResolutionPlan":
+        """Get compiled asynchronous resolution plan for typing"""
+        raise NotImplementedError()
+
+    def clear_plans(self) -> None:
+        """Drop compiled resolution plans"""
+        raise NotImplementedError()
+
 
 class BaseCondition(ABC):
     def __init__(self, resolver: IResolver, dependency_storage):
@@ -75,6 +154,26 @@ class BaseCondition(ABC):
     def handle(self, typing: Any) -> Any:
         """Get attributes from container for typing"""
 
+    def compile(self, typing: Any) -> Callable[[], Any]:
+        """Get a callable that returns attributes for typing without checking it again"""
+        return partial(self.handle, typing)
+
+    def compile_async(self, typing: Any) -> Callable[[], Awaitable[Any]]:
+        """Get a coroutine function that returns attributes for typing without checking it again"""
+        get_attributes = self.compile(typing)
+
+        async def get_async_attributes() -> Any:
+            return get_attributes()
+
+        return get_async_attributes
+
+    def validate(self, typing: Any) -> None:
+        """Raise an exception if attributes for typing cannot be resolved"""
+
+    def get_dependencies(self, typing: Any) -> Optional[Tuple[Any, ...]]:
+        """Get typings whose dependencies attributes for typing can hold, None when they are unknown"""
+        return None
+
 
 class IConditionCollections(ABC):
     @abstractmethod
@@ -84,3 +183,23 @@ class IConditionCollections(ABC):
     @abstractmethod
     def find(self, typing: Any) -> Optional[Any]:
         """Finding a condition for type and getting attributes"""
+
+    def compile(self, typing: Any) -> Callable[[], Any]:
+        """Finding a condition for type and compiling attributes getter"""
+        return partial(self.find, typing)
+
+    def compile_async(self, typing: Any) -> Callable[[], Awaitable[Any]]:
+        """Finding a condition for type and compiling asynchronous attributes getter"""
+        get_attributes = self.compile(typing)
+
+        async def get_async_attributes() -> Any:
+            return get_attributes()
+
+        return get_async_attributes
+
+    def validate(self, typing: Any) -> None:
+        """Finding a condition for type and checking that attributes can be resolved"""
+
+    def get_dependencies(self, typing: Any) -> Optional[Tuple[Any, ...]]:
+        """Finding a condition for type and getting typings that are resolved with it, None when they are unknown"""
+        return None
@@ -0,0 +1,56 @@
+import linecache
+from itertools import count
+from typing import Any, Callable, Dict, Optional
+from weakref import finalize
+
+_sources = count()
+_FILENAME_PREFIX = "<pyject factory "
+
+
+class FactorySource:
+    """Source of a generated factory function and the objects that it refers to"""
+
+    def __init__(self, name: str, max_calls: int = 64) -> None:
+        self.name = name if name.isidentifier() else "create"
+        self.namespace: Dict[str, Any] = {}
+        self.calls = 0
+        self.max_calls = max_calls
+        self._names: Dict[int, str] = {}
+
+    @property
+    def is_full(self) -> bool:
+        """Whether no more constructor calls should be inlined into the source"""
+        return self.calls >= self.max_calls
+
+    def bind(self, value: Any, prefix: str) -> str:
+        """Get name under which value is available to the generated source"""
+        name = self._names.get(id(value), None)
+        if name is None:
+            name = f"{prefix}{len(self._names)}"
+            self._names[id(value)] = name
+            self.namespace[name] = value
+        return name
+
+    def call(self, target_name: str, arguments: Dict[str, str]) -> str:
+        """Get expression that calls bound target with keyword arguments given as expressions"""
+        self.calls += 1
+        return f"{target_name}({', '.join(f'{name}={value}' for name, value in arguments.items())})"
+
+    def compile(self, expression: str) -> Callable[[], Any]:
+        """Compile function returning expression, keeping its source available to inspect and tracebacks"""
+        source = f"def {self.name}():\n    return {expression}\n"
+        filename = f"{_FILENAME_PREFIX}{next(_sources)}>"
+        exec(compile(source, filename, "exec"), self.namespace)
+        function = self.namespace[self.name]
+
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        finalize(function, linecache.cache.pop, filename, None)
+        return function
+
+
+def get_source(function: Callable[..., Any]) -> Optional[str]:
+    """Get source of function if it was generated by FactorySource"""
+    code = getattr(function, "__code__", None)
+    if code is None or not code.co_filename.startswith(_FILENAME_PREFIX):
+        return None
+    return "".join(linecache.getlines(code.co_filename))
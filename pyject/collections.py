@@ -1,16 +1,35 @@
-from typing import List, Optional, Any, Union, Type, Dict, Iterator
+from abc import ABCMeta
+from contextvars import ContextVar, Token
+from weakref import WeakSet
+from typing import List, Optional, Any, Union, Type, Dict, Iterator, Callable, Set, Awaitable, Tuple
 
-from pyject.exception import DependencyNotFound
-from pyject.annotations import get_annotations_to_implementation
+from pyject.exception import DependencyNotFound, ContainerFrozenException
+from pyject.annotations import signature_cache, annotation_keys
 from pyject.models import Scope
 from pyject.base import BaseCondition, IResolver, IConditionCollections
-from pyject.models import DependencyWrapper
-from pyject.utils import get_typing_args
+from pyject.models import DependencyWrapper, LazyImport, NOT_PARSED, _checking_for_finding_itself_in_annotations
+from pyject.utils import _check_annotation, reset_context_var
 
 
-def _get_dependency_wrapper(annotation: Any, implementation: Any, scope: Union[Scope, int]) -> DependencyWrapper:
-    annotations = get_annotations_to_implementation(implementation)
-    type_args = get_typing_args(annotation)
+DependentsFinder = Callable[[Any], List[DependencyWrapper]]
+
+
+def _get_dependency_wrapper(
+    annotation: Any, implementation: Any, scope: Union[Scope, int], is_lazy: bool = False
+) -> DependencyWrapper:
+    dependency_alias = annotation_keys.get(annotation)
+    type_args = () if dependency_alias is annotation else dependency_alias[1]
+    if implementation.__class__ is LazyImport or is_lazy and hasattr(implementation, "__call__"):
+        return DependencyWrapper(
+            type_=annotation,
+            target=implementation,
+            annotations=NOT_PARSED,
+            scope=scope,
+            type_arguments=type_args
+        )
+
+    # the cache shares one annotations tuple between all registrations of an implementation
+    annotations = signature_cache.get(implementation)
     return DependencyWrapper(
         type_=annotation,
         target=implementation,
@@ -21,17 +40,100 @@ def _get_dependency_wrapper(annotation: Any, implementation: Any, scope: Union[S
     )
 
 
-def _checking_for_finding_itself_in_annotations(wrapper: DependencyWrapper) -> None:
-    error = Exception("Dependency cannot have itself in annotations")
-    if not wrapper.type_arguments and wrapper.annotations is not None:
-        for annotation in wrapper.annotations:
-            annotation_args = get_typing_args(annotation[1])
-            if not annotation_args and annotation[1] == wrapper.type_:
-                raise error
+def _get_dependency_alias(wrapper: DependencyWrapper) -> Any:
+    return annotation_keys.get(wrapper.type_)
+
+
+def _get_implementation(implementation: Any) -> Any:
+    if isinstance(implementation, str) and ":" in implementation:
+        return LazyImport(implementation)
+    return implementation
+
+
+def _get_none() -> None:
+    return None
+
+
+async def _get_none_async() -> None:
+    return None
+
+
+class DependencyOverlay:
+    """Dependencies overridden in the current context on top of the storage"""
+
+    __slots__ = ("dependencies", "local_singletons", "is_clear_cache", "singletons", "plan_cache")
+
+    def __init__(
+        self,
+        dependencies: Dict[Any, List[DependencyWrapper]],
+        local_singletons: Optional[Set[int]],
+        is_clear_cache: bool = True
+    ) -> None:
+        self.dependencies = dependencies
+        # ids of singletons that depend on overridden dependencies, None when all of them do
+        self.local_singletons = local_singletons
+        self.is_clear_cache = is_clear_cache
+        self.singletons: Dict[int, Any] = {}
+        self.plan_cache: Any = None
+
+    def is_local(self, wrapper: DependencyWrapper) -> bool:
+        """Whether the singleton must be created again while the overlay is active"""
+        return self.local_singletons is None or id(wrapper) in self.local_singletons
+
+
+class DependentsIndex:
+    """Dependencies indexed by annotations of their attributes and by base classes of those annotations"""
+
+    __slots__ = ("dependents", "typings_by_base", "unknown")
+
+    def __init__(self) -> None:
+        self.dependents: Dict[Any, List[DependencyWrapper]] = {}
+        self.typings_by_base: Dict[Any, List[Any]] = {}
+        # dependencies with attributes of custom conditions may depend on anything
+        self.unknown: List[DependencyWrapper] = []
+
+    def add(self, typing: Any, wrapper: DependencyWrapper) -> None:
+        """Add dependency whose attribute depends on typing"""
+        try:
+            typing_dependents = self.dependents.get(typing, None)
+        except TypeError:
+            return
+        if typing_dependents is not None:
+            typing_dependents.append(wrapper)
+            return
+
+        self.dependents[typing] = [wrapper]
+        # typing is compatible with aliases of its base classes, or of classes of it when it is not a class
+        bases = typing.__mro__ if isinstance(typing, type) else type(typing).__mro__
+        for base in bases:
+            typings = self.typings_by_base.get(base, None)
+            if typings is None:
+                self.typings_by_base[base] = [typing]
             else:
-                for annotation_arg in annotation_args:
-                    if annotation_arg == wrapper.type_:
-                        raise error
+                typings.append(typing)
+
+    def get(self, dependency_alias: Any, dependency_type: Any) -> Iterator[List[DependencyWrapper]]:
+        """Get dependencies of typings that are resolved by the alias"""
+        for typing in (dependency_alias, dependency_type):
+            try:
+                typing_dependents = self.dependents.get(typing, None)
+            except TypeError:
+                continue
+            if typing_dependents is not None:
+                yield typing_dependents
+        if isinstance(dependency_type, ABCMeta):
+            # virtual subclasses of abstract classes are not in __mro__, so all typings are checked
+            for typing, typing_dependents in self.dependents.items():
+                if _check_annotation(typing, dependency_type):
+                    yield typing_dependents
+        elif isinstance(dependency_type, type):
+            for typing in self.typings_by_base.get(dependency_type, ()):
+                yield self.dependents[typing]
+        if self.unknown:
+            yield self.unknown
+
+    def __bool__(self) -> bool:
+        return bool(self.dependents) or bool(self.unknown)
 
 
 class DependencyStorageOverrideContext:
@@ -40,22 +142,23 @@ class DependencyStorageOverrideContext:
         dependency_storage: "DependencyStorage",
         annotation: Any,
         spoofed_implementations: List[Any],
-        replaceable_implementations: List[Any],
         is_clear_cache: bool = True
     ) -> None:
         self._dependency_storage = dependency_storage
         self._annotation = annotation
         self._spoofed_implementations = spoofed_implementations
-        self._replaceable_implementations = replaceable_implementations
         self._is_clear_cache = is_clear_cache
+        self._tokens: List[Token] = []
 
     def __enter__(self) -> None:
-        self._dependency_storage._override(
-            self._annotation, self._spoofed_implementations, is_clear_cache=self._is_clear_cache
+        self._tokens.append(
+            self._dependency_storage._enter_overlay(
+                self._annotation, self._spoofed_implementations, is_clear_cache=self._is_clear_cache
+            )
         )
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        self._dependency_storage._release_overdetermined_dependency(self._annotation, self._replaceable_implementations)
+        self._dependency_storage._exit_overlay(self._tokens.pop())
 
     def __call__(self, *args, **kwargs):
         self._dependency_storage._override(
@@ -63,37 +166,111 @@ class DependencyStorageOverrideContext:
         )
 
 
+class ChangeCounter:
+    """Number of dependencies added to the storages of one container and its children"""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+
 class DependencyStorage:
-    def __init__(self):
+    def __init__(self, *, is_lazy: bool = False):
+        self._is_lazy = is_lazy
         self._dependencies: Dict[Any, List[DependencyWrapper]] = {}
+        self._dependency_types: Dict[Any, Any] = {}
+        self._compatible_annotations: Dict[Any, List[Any]] = {}
+        self._subscribers: List[Callable[[], None]] = []
+        self._registered_dependencies: Dict[Any, List[DependencyWrapper]] = {}
+        self._overriding_dependencies: Dict[Any, List[DependencyWrapper]] = {}
+        self._dependents_finder: Optional[DependentsFinder] = None
+        self._change_counter = ChangeCounter()
+        self._overlay: ContextVar[Optional[DependencyOverlay]] = ContextVar(f"_overlay_{id(self)}", default=None)
+        self._children: "WeakSet[DependencyStorage]" = WeakSet()
+        self._dependent_singletons: Dict[Any, Tuple[List[DependencyWrapper], List[DependencyWrapper]]] = {}
+
+    @property
+    def overlay_context(self) -> "ContextVar[Optional[DependencyOverlay]]":
+        """Context variable with dependencies overridden in the current context"""
+        return self._overlay
+
+    @property
+    def version(self) -> int:
+        """Number that changes each time a dependency is added to the storage, its parent or one of its children"""
+        return self._change_counter.value
+
+    @property
+    def change_counter(self) -> ChangeCounter:
+        """Counter behind the version, cheaper to check on each resolution than the property"""
+        return self._change_counter
+
+    def set_dependents_finder(self, finder: DependentsFinder) -> None:
+        """Set callable that gets dependencies depending on an annotation, so overrides drop only their caches"""
+        self._dependents_finder = finder
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """Add a callback that will be called after dependencies are overridden, additions only change the version"""
+        self._subscribers.append(callback)
+
+    def notify(self) -> None:
+        """Call subscribers as if dependencies changed, so that everything compiled from them is dropped"""
+        self._notify()
+
+    def _notify(self) -> None:
+        for callback in self._subscribers:
+            callback()
+        # children are referenced weakly, so that dropped ones are not kept alive by their parent
+        for child in list(self._children):
+            child._notify()
 
     def _add_dependency(self, wrapper: DependencyWrapper) -> None:
-        if wrapper.type_arguments:
-            dependency_alias = (wrapper.type_, wrapper.type_arguments)
-        else:
-            dependency_alias = wrapper.type_
+        dependency_alias = _get_dependency_alias(wrapper)
 
-        _checking_for_finding_itself_in_annotations(wrapper)
+        if not wrapper.is_lazy:
+            _checking_for_finding_itself_in_annotations(wrapper)
 
         dependency = self._dependencies.get(dependency_alias, None)
         if dependency is None:
-            self._dependencies[dependency_alias] = [wrapper]
+            dependency = [wrapper]
+            self._dependencies[dependency_alias] = dependency
+            self._registered_dependencies[dependency_alias] = dependency
+            self._index_annotation(dependency_alias, wrapper.type_)
         else:
             dependency.append(wrapper)
+        # subscribers compare versions when they need plans, so registering many dependencies stays cheap
+        self._change_counter.value += 1
+
+    def _index_annotation(self, dependency_alias: Any, dependency_type: Any) -> None:
+        self._dependency_types[dependency_alias] = dependency_type
+        for typing, compatible_annotations in self._compatible_annotations.items():
+            if typing != dependency_alias and _check_annotation(typing, dependency_type):
+                compatible_annotations.append(dependency_alias)
+
+    def _get_compatible_annotations(self, typing: Any) -> List[Any]:
+        compatible_annotations = self._compatible_annotations.get(typing, None)
+        if compatible_annotations is None:
+            compatible_annotations = [
+                dependency_alias
+                for dependency_alias, dependency_type in self._dependency_types.items()
+                if dependency_alias != typing and _check_annotation(typing, dependency_type)
+            ]
+            self._compatible_annotations[typing] = compatible_annotations
+        return compatible_annotations
 
     def add_transient(self, annotation: Any, implementation: Any) -> None:
         self._add_dependency(
-            _get_dependency_wrapper(annotation, implementation, Scope.TRANSIENT)
+            _get_dependency_wrapper(annotation, _get_implementation(implementation), Scope.TRANSIENT, self._is_lazy)
         )
 
     def add_singleton(self, annotation: Any, implementation: Any) -> None:
         self._add_dependency(
-            _get_dependency_wrapper(annotation, implementation, Scope.SINGLETON)
+            _get_dependency_wrapper(annotation, _get_implementation(implementation), Scope.SINGLETON, self._is_lazy)
         )
 
     def add_context(self, annotation: Any, implementation: Any) -> None:
         self._add_dependency(
-            _get_dependency_wrapper(annotation, implementation, Scope.CONTEXT)
+            _get_dependency_wrapper(annotation, _get_implementation(implementation), Scope.CONTEXT, self._is_lazy)
         )
 
     def add_constant(self, annotation: Any, implementation: Any) -> None:
@@ -109,15 +286,15 @@ class DependencyStorage:
         *,
         is_clear_cache: bool = True
     ) -> DependencyStorageOverrideContext:
-        """Context manager overriding dependency in with block"""
+        """Context manager overriding dependency in with block for the current context, or globally when called"""
         implementation = implementation if implementation is not None else []
         implementations = implementation if isinstance(implementation, list) else [implementation]
 
         factory = factory if factory is not None else []
         factories = factory if isinstance(factory, list) else [factory]
 
-        replaceable_implementations = self._dependencies.get(annotation, None)
-        if replaceable_implementations is None:
+        dependency_alias = annotation_keys.get(annotation)
+        if self._find_dependencies(dependency_alias) is None:
             raise DependencyNotFound("Dependency not found in container")
 
         spoofed_implementations = []
@@ -129,9 +306,7 @@ class DependencyStorage:
         for factory in factories:
             spoofed_implementations.append(_get_dependency_wrapper(annotation, factory, Scope.TRANSIENT))
 
-        return DependencyStorageOverrideContext(
-            self, annotation, spoofed_implementations, replaceable_implementations, is_clear_cache
-        )
+        return DependencyStorageOverrideContext(self, dependency_alias, spoofed_implementations, is_clear_cache)
 
     def _override(
         self,
@@ -140,17 +315,65 @@ class DependencyStorage:
         *,
         is_clear_cache: bool = True
     ) -> None:
-        if is_clear_cache:
-            self.clear_cache()
         self._dependencies[annotation] = spoofed_implementations
+        if self._registered_dependencies.get(annotation, None) is spoofed_implementations:
+            self._overriding_dependencies.pop(annotation, None)
+        else:
+            self._overriding_dependencies[annotation] = spoofed_implementations
 
-    def _release_overdetermined_dependency(self, annotation: Any, replaceable_implementations: List[Any]) -> None:
-        self._dependencies[annotation] = replaceable_implementations
+        if is_clear_cache:
+            if self._dependents_finder is None:
+                self.clear_cache()
+            else:
+                for wrapper in self._get_dependent_singletons(annotation):
+                    wrapper.cache = None
+        self._notify()
+
+    def _get_dependent_singletons(self, annotation: Any) -> List[DependencyWrapper]:
+        dependents = self._dependents_finder(annotation)  # type: ignore
+        # the finder returns the same list until dependencies change, so overrides reuse the filtered singletons
+        cached = self._dependent_singletons.get(annotation, None)
+        if cached is not None and cached[0] is dependents:
+            return cached[1]
+
+        singletons = [wrapper for wrapper in dependents if self._is_dependent_singleton(wrapper)]
+        self._dependent_singletons[annotation] = (dependents, singletons)
+        return singletons
+
+    def _is_dependent_singleton(self, wrapper: DependencyWrapper) -> bool:
+        return wrapper.scope == Scope.SINGLETON and not wrapper.is_lazy and wrapper.annotations is not None
+
+    def _enter_overlay(self, annotation: Any, spoofed_implementations: List[Any], *, is_clear_cache: bool = True) -> Token:
+        parent = self._overlay.get()
+        if parent is None:
+            dependencies = {annotation: spoofed_implementations}
+            local_singletons: Optional[Set[int]] = set()
+        else:
+            dependencies = dict(parent.dependencies)
+            dependencies[annotation] = spoofed_implementations
+            local_singletons = None if parent.local_singletons is None else set(parent.local_singletons)
+
+        overlay = DependencyOverlay(dependencies, local_singletons, is_clear_cache)
+        token = self._overlay.set(overlay)
+        if self._dependents_finder is None:
+            overlay.local_singletons = None
+        elif overlay.local_singletons is not None:
+            try:
+                overlay.local_singletons.update(map(id, self._get_dependent_singletons(annotation)))
+            except BaseException:
+                self._overlay.reset(token)
+                raise
+        return token
+
+    def _exit_overlay(self, token: Token) -> None:
+        reset_context_var(self._overlay, token)
 
     def clear_cache(self) -> None:
         """clear the singleton dependency cache"""
         for dependency_wrappers in self._dependencies.values():
             for dependency_wrapper in dependency_wrappers:
+                if dependency_wrapper.is_lazy:
+                    continue
                 if dependency_wrapper.annotations is None and dependency_wrapper.cache is not None:
                     continue
                 dependency_wrapper.cache = None
@@ -163,14 +386,174 @@ class DependencyStorage:
             for dependency_wrapper in dependency_wrappers:
                 yield dependency_wrapper
 
+    def owns(self, wrapper: DependencyWrapper) -> bool:
+        """Whether the dependency was added to this storage rather than to one of its parents"""
+        dependency_wrappers = self._registered_dependencies.get(_get_dependency_alias(wrapper), ())
+        return any(dependency_wrapper is wrapper for dependency_wrapper in dependency_wrappers)
+
+    def get_registered_dependencies(self) -> Iterator[DependencyWrapper]:
+        """Get unresolved iterator object/class added to the storage, ignoring overrides"""
+        for dependency_wrappers in self._registered_dependencies.values():
+            for dependency_wrapper in dependency_wrappers:
+                yield dependency_wrapper
+
+    def get_overriding_dependencies(self) -> Iterator[DependencyWrapper]:
+        """Get unresolved iterator object/class that currently replace added ones"""
+        for dependency_wrappers in self._overriding_dependencies.values():
+            for dependency_wrapper in dependency_wrappers:
+                yield dependency_wrapper
+
+        overlay = self._overlay.get()
+        if overlay is not None:
+            for dependency_wrappers in overlay.dependencies.values():
+                for dependency_wrapper in dependency_wrappers:
+                    yield dependency_wrapper
+
+    def get_annotations(self) -> List[Any]:
+        """Get annotations under which dependencies are stored"""
+        return list(self._dependencies)
+
+    def get_compatible_dependencies(self, typing: Any) -> Iterator[DependencyWrapper]:
+        """Get unresolved iterator object/class registered under annotations that typing is compatible with"""
+        for dependency_alias in self._get_compatible_annotations(typing):
+            for dependency_wrapper in self.get_dependencies_by_annotation(dependency_alias):
+                yield dependency_wrapper
+
+    def get_dependency_type(self, dependency_alias: Any) -> Any:
+        """Get annotation type of the alias under which dependencies are stored"""
+        return self._dependency_types.get(dependency_alias, dependency_alias)
+
+    def _find_dependencies(self, annotation: Any) -> Optional[List[DependencyWrapper]]:
+        return self._dependencies.get(annotation, None)
+
     def get_dependencies_by_annotation(self, annotation: Any) -> List[DependencyWrapper]:
         """Get unresolved object/class by annotation"""
-        return self._dependencies.get(annotation, [])
+        overlay = self._overlay.get()
+        if overlay is not None:
+            dependencies = overlay.dependencies.get(annotation, None)
+            if dependencies is not None:
+                return dependencies
+        dependencies = self._find_dependencies(annotation)
+        return [] if dependencies is None else dependencies
 
     def __len__(self) -> int:
         return len(self._dependencies)
 
 
+class ChildDependencyStorage(DependencyStorage):
+    """Dependency storage that falls back to its parent for annotations that were not added to it"""
+
+    def __init__(self, parent: DependencyStorage, *, is_lazy: bool = False) -> None:
+        super().__init__(is_lazy=is_lazy)
+        self._parent = parent
+        parent._children.add(self)
+        # additions to siblings drop plans of each other too, but they are rare after the setup
+        self._change_counter = parent._change_counter
+
+    def _find_dependencies(self, annotation: Any) -> Optional[List[DependencyWrapper]]:
+        dependencies = self._dependencies.get(annotation, None)
+        if dependencies is None:
+            # context-local overrides of the parent are not seen, its children are overridden on their own
+            return self._parent._find_dependencies(annotation)
+        return dependencies
+
+    def _get_compatible_annotations(self, typing: Any) -> List[Any]:
+        compatible_annotations = super()._get_compatible_annotations(typing)
+        parent_compatible_annotations = [
+            dependency_alias
+            for dependency_alias in self._parent._get_compatible_annotations(typing)
+            if dependency_alias not in self._dependency_types
+        ]
+        if not parent_compatible_annotations:
+            return compatible_annotations
+        return compatible_annotations + parent_compatible_annotations
+
+    def _is_dependent_singleton(self, wrapper: DependencyWrapper) -> bool:
+        # singletons of the parent are shared with it, so overrides of the child never drop them
+        return super()._is_dependent_singleton(wrapper) and self.owns(wrapper)
+
+    def get_dependencies(self, *, ignore_annotation: Optional[Any] = None) -> Iterator[DependencyWrapper]:
+        """Get unresolved iterator object/class"""
+        for annotation in self.get_annotations():
+            if annotation == ignore_annotation:
+                continue
+            for dependency_wrapper in self._find_dependencies(annotation):  # type: ignore
+                yield dependency_wrapper
+
+    def get_registered_dependencies(self) -> Iterator[DependencyWrapper]:
+        """Get unresolved iterator object/class added to the storage or its parents, ignoring overrides"""
+        for dependency_wrapper in super().get_registered_dependencies():
+            yield dependency_wrapper
+        for dependency_wrapper in self._parent.get_registered_dependencies():
+            if _get_dependency_alias(dependency_wrapper) not in self._registered_dependencies:
+                yield dependency_wrapper
+
+    def get_annotations(self) -> List[Any]:
+        """Get annotations under which dependencies are stored"""
+        annotations = list(self._dependencies)
+        annotations.extend(
+            annotation for annotation in self._parent.get_annotations() if annotation not in self._dependencies
+        )
+        return annotations
+
+    def get_dependency_type(self, dependency_alias: Any) -> Any:
+        """Get annotation type of the alias under which dependencies are stored"""
+        if dependency_alias in self._dependency_types:
+            return self._dependency_types[dependency_alias]
+        return self._parent.get_dependency_type(dependency_alias)
+
+    def __len__(self) -> int:
+        return len(self.get_annotations())
+
+
+class FrozenDependencyStorage(DependencyStorage):
+    """Dependency storage that rejects new dependencies but can still be overridden"""
+
+    def __init__(self, dependency_storage: DependencyStorage, constants: Optional[Dict[Any, Any]] = None) -> None:
+        super().__init__()
+        # wrappers hold singletons and are changed by overrides, so only their parsed annotations are shared
+        copies: Dict[int, DependencyWrapper] = {}
+        for dependency_alias in dependency_storage.get_annotations():
+            dependency_wrappers = dependency_storage._find_dependencies(dependency_alias)
+            wrapper_copies = []
+            for wrapper in dependency_wrappers:  # type: ignore
+                wrapper_copy = copies.get(id(wrapper), None)
+                if wrapper_copy is None:
+                    wrapper_copy = wrapper.copy()
+                    copies[id(wrapper)] = wrapper_copy
+                wrapper_copies.append(wrapper_copy)
+            self._dependencies[dependency_alias] = wrapper_copies
+            self._dependency_types[dependency_alias] = dependency_storage.get_dependency_type(dependency_alias)
+
+        if constants is not None:
+            for annotation, implementation in constants.items():
+                wrapper = _get_dependency_wrapper(annotation, implementation, Scope.SINGLETON)
+                wrapper.cache = implementation
+                self._dependencies[annotation] = [wrapper]
+                self._dependency_types[annotation] = annotation
+
+        self._registered_dependencies = dict(self._dependencies)
+        self._overridden_annotations: Set[Any] = set()
+
+    @property
+    def is_overridden(self) -> bool:
+        """Whether some dependencies differ from the ones present when freezing"""
+        return bool(self._overridden_annotations)
+
+    def _add_dependency(self, wrapper: DependencyWrapper) -> None:
+        raise ContainerFrozenException("Dependencies cannot be added to a frozen container")
+
+    def _override(
+        self,
+        annotation: Any,
+        spoofed_implementations: List[Any],
+        *,
+        is_clear_cache: bool = True
+    ) -> None:
+        self._overridden_annotations.add(annotation)
+        super()._override(annotation, spoofed_implementations, is_clear_cache=is_clear_cache)
+
+
 class ConditionCollections(IConditionCollections):
     def __init__(
         self,
@@ -187,20 +570,71 @@ class ConditionCollections(IConditionCollections):
             for condition in conditions:
                 self._conditions.append(self._resolve_condition(condition))
         self._default_condition = self._resolve_condition(default_condition) if default_condition is not None else None
+        self._dispatch_cache: Dict[Any, Optional[BaseCondition]] = {}
 
     def add(self, condition: Type[BaseCondition]) -> None:
         """Add a condition to apply it in the dependency solution"""
         self._conditions.append(self._resolve_condition(condition))
+        self.clear_cache()
+        self._resolver.clear_plans()
 
-    def find(self, typing: Any) -> Optional[Any]:
-        """Finding a condition for type and getting attributes"""
+    def clear_cache(self) -> None:
+        """Clear the cache of conditions chosen for typings"""
+        self._dispatch_cache = {}
+
+    def _get_condition(self, typing: Any) -> Optional[BaseCondition]:
+        try:
+            return self._dispatch_cache[typing]
+        except KeyError:
+            condition = self._find_condition(typing)
+            self._dispatch_cache[typing] = condition
+            return condition
+        except TypeError:
+            return self._find_condition(typing)
+
+    def _find_condition(self, typing: Any) -> Optional[BaseCondition]:
         for condition in self._conditions:
             if condition.check_typing(typing):
-                return condition.handle(typing)
+                return condition
+        return self._default_condition
 
-        if self._default_condition is not None:
-            return self._default_condition.handle(typing)
-        return None
+    def get_condition(self, typing: Any) -> Optional[BaseCondition]:
+        """Get condition that handles typing"""
+        return self._get_condition(typing)
+
+    def find(self, typing: Any) -> Optional[Any]:
+        """Finding a condition for type and getting attributes"""
+        condition = self._get_condition(typing)
+        if condition is None:
+            return None
+        return condition.handle(typing)
+
+    def compile(self, typing: Any) -> Callable[[], Any]:
+        """Finding a condition for type and compiling attributes getter"""
+        condition = self._get_condition(typing)
+        if condition is None:
+            return _get_none
+        return condition.compile(typing)
+
+    def compile_async(self, typing: Any) -> Callable[[], Awaitable[Any]]:
+        """Finding a condition for type and compiling asynchronous attributes getter"""
+        condition = self._get_condition(typing)
+        if condition is None:
+            return _get_none_async
+        return condition.compile_async(typing)
+
+    def validate(self, typing: Any) -> None:
+        """Finding a condition for type and checking that attributes can be resolved"""
+        condition = self._get_condition(typing)
+        if condition is not None:
+            condition.validate(typing)
+
+    def get_dependencies(self, typing: Any) -> Optional[Tuple[Any, ...]]:
+        """Finding a condition for type and getting typings that are resolved with it, None when they are unknown"""
+        condition = self._get_condition(typing)
+        if condition is None:
+            return ()
+        return condition.get_dependencies(typing)
 
     def _resolve_condition(self, condition: Type[BaseCondition]) -> BaseCondition:
         return condition(self._resolver, self._dependency_storage)
@@ -1,8 +1,11 @@
-from typing import List, Any, Optional, Dict, Iterator, Sequence, NoReturn, get_args
+import asyncio
+from typing import List, Any, Optional, Dict, Iterator, Sequence, NoReturn, Callable, Awaitable, Tuple
 
+from pyject.annotations import annotation_keys
 from pyject.base import BaseCondition
 from pyject.exception import DependencyResolvingException
-from pyject.types import ForwardRef
+from pyject.plan import ResolutionPlan, AsyncResolutionPlan, NOT_FOUND
+from pyject.types import ForwardRef, Provider
 from pyject.utils import check_generic_typing, check_union_typing, check_collection_typing, get_typing_args
 
 
@@ -16,6 +19,19 @@ class DefaultCondition(BaseCondition):
 
         raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
 
+    def compile(self, typing: Any) -> Callable[[], Any]:
+        return _compile_first(self._resolver.get_plan(typing), typing)
+
+    def compile_async(self, typing: Any) -> Callable[[], Awaitable[Any]]:
+        return _compile_async_first(self._resolver.get_async_plan(typing), typing)
+
+    def validate(self, typing: Any) -> None:
+        if not self._resolver.get_plan(typing):
+            raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+
+    def get_dependencies(self, typing: Any) -> Tuple[Any, ...]:
+        return (typing,)
+
 
 class AnyCondition(BaseCondition):
     _type_names_to_check = {"Any"}
@@ -28,6 +44,12 @@ class AnyCondition(BaseCondition):
     def handle(self, typing: Any) -> NoReturn:
         raise DependencyResolvingException(f"Any or empty annotation is not supported")
 
+    def validate(self, typing: Any) -> None:
+        raise DependencyResolvingException(f"Any or empty annotation is not supported")
+
+    def get_dependencies(self, typing: Any) -> Tuple[Any, ...]:
+        return ()
+
 
 class UnionCondition(BaseCondition):
     def check_typing(self, typing: Any) -> bool:
@@ -49,6 +71,61 @@ class UnionCondition(BaseCondition):
 
         raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
 
+    def compile(self, typing: Any) -> Callable[[], Any]:
+        args = typing.__args__
+        if len(args) == 2 and args[1] is type(None):
+            plan = self._resolver.get_plan(args[0])
+
+            def get_optional_dependency() -> Any:
+                return plan.first(None)
+
+            return get_optional_dependency
+
+        plans = tuple(self._resolver.get_plan(inner_type) for inner_type in args)
+
+        def get_union_dependency() -> Any:
+            for inner_plan in plans:
+                dependency = inner_plan.first()
+                if dependency is not NOT_FOUND:
+                    return dependency
+            raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+
+        return get_union_dependency
+
+    def compile_async(self, typing: Any) -> Callable[[], Awaitable[Any]]:
+        args = typing.__args__
+        if len(args) == 2 and args[1] is type(None):
+            plan = self._resolver.get_async_plan(args[0])
+
+            async def get_optional_dependency() -> Any:
+                return await plan.first(None)
+
+            return get_optional_dependency
+
+        plans = tuple(self._resolver.get_async_plan(inner_type) for inner_type in args)
+
+        async def get_union_dependency() -> Any:
+            for inner_plan in plans:
+                dependency = await inner_plan.first()
+                if dependency is not NOT_FOUND:
+                    return dependency
+            raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+
+        return get_union_dependency
+
+    def validate(self, typing: Any) -> None:
+        args = typing.__args__
+        if len(args) == 2 and args[1] is type(None):
+            return
+
+        for inner_type in args:
+            if self._resolver.get_plan(inner_type):
+                return
+        raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+
+    def get_dependencies(self, typing: Any) -> Tuple[Any, ...]:
+        return tuple(typing.__args__)
+
 
 class CollectionCondition(BaseCondition):
     def check_typing(self, typing: Any) -> bool:
@@ -66,6 +143,43 @@ class CollectionCondition(BaseCondition):
             raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
         return field_attributes
 
+    def compile(self, typing: Any) -> Callable[[], Any]:
+        plans = tuple(self._resolver.get_plan(inner_type) for inner_type in typing.__args__)
+
+        def get_dependencies() -> List[Any]:
+            field_attributes = []
+            for plan in plans:
+                field_attributes.extend(plan.all())
+
+            if not field_attributes:
+                raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+            return field_attributes
+
+        return get_dependencies
+
+    def compile_async(self, typing: Any) -> Callable[[], Awaitable[Any]]:
+        plans = tuple(self._resolver.get_async_plan(inner_type) for inner_type in typing.__args__)
+
+        async def get_dependencies() -> List[Any]:
+            field_attributes = []
+            for dependencies in await asyncio.gather(*[plan.all() for plan in plans]):
+                field_attributes.extend(dependencies)
+
+            if not field_attributes:
+                raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+            return field_attributes
+
+        return get_dependencies
+
+    def validate(self, typing: Any) -> None:
+        for inner_type in typing.__args__:
+            if self._resolver.get_plan(inner_type):
+                return
+        raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+
+    def get_dependencies(self, typing: Any) -> Tuple[Any, ...]:
+        return tuple(typing.__args__)
+
 
 class IteratorCondition(BaseCondition):
     _type_names_to_check = {"Iterator"}
@@ -83,6 +197,17 @@ class IteratorCondition(BaseCondition):
             for dependency in self._resolver.get_resolved_dependencies(typing):
                 yield dependency
 
+    def compile(self, typing: Any) -> Callable[[], Any]:
+        plans = tuple(self._resolver.get_plan(inner_type) for inner_type in typing.__args__)
+
+        def get_iterator() -> Iterator[Any]:
+            return _iterate_plans(plans)
+
+        return get_iterator
+
+    def get_dependencies(self, typing: Any) -> Tuple[Any, ...]:
+        return tuple(typing.__args__)
+
 
 class ForwardRefCondition(BaseCondition):
     _type_names_to_check = {"ForwardRef"}
@@ -104,6 +229,70 @@ class ForwardRefCondition(BaseCondition):
         forward_ref._ForwardRef__set_generic_typing(typing_args[0])
         return forward_ref
 
+    def compile(self, typing: Any) -> Callable[[], ForwardRef]:
+        typing_args = get_typing_args(typing)
+        if not typing_args:
+            raise Exception("It is necessary to transfer the generic to Forwardref")
+
+        forward_ref_class = typing.__origin__
+        generic_typing = typing_args[0]
+        plan = self._resolver.get_plan(generic_typing)
+        resolver = self._resolver
+        dependency_storage = self._dependency_storage
+
+        def get_forward_ref() -> ForwardRef:
+            forward_ref = forward_ref_class(resolver, dependency_storage)
+            forward_ref._ForwardRef__set_generic_typing(generic_typing, plan)
+            return forward_ref
+
+        return get_forward_ref
+
+    def validate(self, typing: Any) -> None:
+        if not get_typing_args(typing):
+            raise Exception("It is necessary to transfer the generic to Forwardref")
+
+    def get_dependencies(self, typing: Any) -> Tuple[Any, ...]:
+        # the referenced dependency is resolved later, but singletons holding the reference keep it
+        return tuple(get_typing_args(typing)[:1])
+
+
+class ProviderCondition(BaseCondition):
+    def check_typing(self, typing: Any) -> bool:
+        origin = getattr(typing, "__origin__", None)
+        if not isinstance(origin, type):
+            return False
+        return issubclass(origin, Provider)
+
+    def handle(self, typing: Any) -> Provider:
+        return self.compile(typing)()
+
+    def compile(self, typing: Any) -> Callable[[], Provider]:
+        dependency_typing = self._get_dependency_typing(typing)
+        get_dependency = _compile_first(self._resolver.get_plan(dependency_typing), dependency_typing)
+        # the provider holds compiled plans only, so one instance is injected everywhere
+        provider = typing.__origin__(get_dependency, self._resolver.get_factory(dependency_typing))
+
+        def get_provider() -> Provider:
+            return provider
+
+        return get_provider
+
+    def validate(self, typing: Any) -> None:
+        dependency_typing = self._get_dependency_typing(typing)
+        if not self._resolver.get_plan(dependency_typing):
+            raise DependencyResolvingException(f"There is no such dependency in the container {dependency_typing}")
+
+    def get_dependencies(self, typing: Any) -> Tuple[Any, ...]:
+        # overriding the dependency must recreate singletons holding its provider
+        return (annotation_keys.get(self._get_dependency_typing(typing)),)
+
+    @staticmethod
+    def _get_dependency_typing(typing: Any) -> Any:
+        typing_args = get_typing_args(typing)
+        if not typing_args:
+            raise DependencyResolvingException("It is necessary to transfer the generic to Provider")
+        return typing_args[0]
+
 
 class GenericCondition(BaseCondition):
     def check_typing(self, typing: Any) -> bool:
@@ -112,7 +301,46 @@ class GenericCondition(BaseCondition):
         return True
 
     def handle(self, typing: Any) -> Dict[str, Any]:
-        for dependency in self._resolver.get_resolved_dependencies((typing, get_args(typing))):
+        for dependency in self._resolver.get_resolved_dependencies(annotation_keys.get(typing)):
             return dependency
 
         raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+
+    def compile(self, typing: Any) -> Callable[[], Any]:
+        return _compile_first(self._resolver.get_plan(annotation_keys.get(typing)), typing)
+
+    def compile_async(self, typing: Any) -> Callable[[], Awaitable[Any]]:
+        return _compile_async_first(self._resolver.get_async_plan(annotation_keys.get(typing)), typing)
+
+    def validate(self, typing: Any) -> None:
+        if not self._resolver.get_plan(annotation_keys.get(typing)):
+            raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+
+    def get_dependencies(self, typing: Any) -> Tuple[Any, ...]:
+        return (annotation_keys.get(typing),)
+
+
+def _compile_first(plan: ResolutionPlan, typing: Any) -> Callable[[], Any]:
+    def get_dependency() -> Any:
+        dependency = plan.first()
+        if dependency is NOT_FOUND:
+            raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+        return dependency
+
+    return get_dependency
+
+
+def _compile_async_first(plan: AsyncResolutionPlan, typing: Any) -> Callable[[], Awaitable[Any]]:
+    async def get_dependency() -> Any:
+        dependency = await plan.first()
+        if dependency is NOT_FOUND:
+            raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+        return dependency
+
+    return get_dependency
+
+
+def _iterate_plans(plans: Sequence[ResolutionPlan]) -> Iterator[Any]:
+    for plan in plans:
+        for dependency in plan:
+            yield dependency
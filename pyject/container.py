@@ -1,24 +1,25 @@
-import sys
-from typing import Any, List, TypeVar, Type, Optional, Dict, Union, Callable, Awaitable, overload
+import inspect
+from functools import wraps
+from typing import Any, List, TypeVar, Type, Optional, Dict, Union, Callable, Awaitable, Tuple, Iterator, overload
 
 from pyject.base import IContainer
 from pyject.exception import DependencyNotFound, DependencyResolvingException
-from pyject.collections import DependencyStorage, DependencyStorageOverrideContext
+from pyject.collections import DependencyStorage, DependencyStorageOverrideContext, FrozenDependencyStorage, \
+    ChildDependencyStorage
 from pyject.resolver import Resolver
-from pyject.annotations import get_annotations_to_implementation
+from pyject.models import WarmupTiming, DependencyStats
+from pyject.plan import NOT_FOUND, ResolutionPlan
+from pyject.scope import DependencyScope
+from pyject.annotations import signature_cache
 from pyject.utils import ContextInstanceMixin, is_coroutine_callable
 
-if sys.version_info == (3, 7):
-    from typing_extensions import get_args
-else:
-    from typing import get_args
-
 T = TypeVar("T")
 
 
 class Container(IContainer, ContextInstanceMixin):
-    def __init__(self) -> None:
-        self._dependency_storage = DependencyStorage()
+    def __init__(self, *, is_lazy: bool = False) -> None:
+        """is_lazy postpones parsing and checking of implementation annotations until they are resolved"""
+        self._dependency_storage = DependencyStorage(is_lazy=is_lazy)
 
         self._resolver = Resolver(self._dependency_storage)
 
@@ -59,37 +60,49 @@ class Container(IContainer, ContextInstanceMixin):
 
     def get(self, annotation):
         """Get object from container"""
-        type_args = get_args(annotation)
-        if type_args:
-            annotation = (annotation, type_args)
+        dependency = self._resolver.get_plan(annotation).first()
+        if dependency is NOT_FOUND:
+            raise DependencyNotFound("Dependency not found")
+        return dependency
+
+    @overload
+    def get_all(self, annotation: Type[T], limit: Optional[int] = None) -> List[T]:
+        ...
 
-        for dependency in self._resolver.get_resolved_dependencies(annotation):
-            return dependency
+    @overload
+    def get_all(self, annotation: Any, limit: Optional[int] = None) -> List[Any]:
+        ...
 
-        raise DependencyNotFound("Dependency not found")
+    def get_all(self, annotation, limit=None):
+        """Get all object from container, or only the first limit of them"""
+        return self._resolver.get_all_resolved_dependencies(annotation, limit)
 
     @overload
-    def get_all(self, annotation: Type[T]) -> T:
+    def iter_all(self, annotation: Type[T]) -> Iterator[T]:
         ...
 
     @overload
-    def get_all(self, annotation: Any) -> Any:
+    def iter_all(self, annotation: Any) -> Iterator[Any]:
         ...
 
-    def get_all(self, annotation):
-        """Get all object from container"""
-        type_args = get_args(annotation)
-        if type_args:
-            annotation = (annotation, type_args)
+    def iter_all(self, annotation):
+        """Get iterator that creates objects from container one by one as they are consumed"""
+        return self._resolver.get_resolved_dependencies(annotation)
 
-        dependencies = []
-        for dependency in self._resolver.get_resolved_dependencies(annotation):
-            dependencies.append(dependency)
-        return dependencies
+    async def async_get(self, annotation: Any) -> Any:
+        """Get object from container resolving asynchronous dependencies"""
+        dependency = await self._resolver.get_async_plan(annotation).first()
+        if dependency is NOT_FOUND:
+            raise DependencyNotFound("Dependency not found")
+        return dependency
+
+    async def async_get_all(self, annotation: Any, limit: Optional[int] = None) -> List[Any]:
+        """Get all object from container, or only the first limit of them, resolving asynchronous dependencies"""
+        return await self._resolver.get_async_plan(annotation).all(limit)
 
     def get_target_attributes(self, target: Any) -> Optional[Dict[str, Any]]:
         """Get resolved object attributes"""
-        annotations = get_annotations_to_implementation(target)
+        annotations = signature_cache.get(target)
         if annotations is not None:
             return self._resolver.get_implementation_attr(annotations)
         return None
@@ -112,12 +125,66 @@ class Container(IContainer, ContextInstanceMixin):
     async def async_resolve(self, target: Callable[..., Awaitable[T]]) -> T:
         """Get resolved async object"""
         if is_coroutine_callable(target):
-            attrs = self.get_target_attributes(target)
-            if attrs is None:
+            annotations = signature_cache.get(target)
+            if annotations is None:
                 raise DependencyResolvingException("Failed to get target attributes")
-            return await target(**attrs)
+            return await target(**await self._resolver.get_async_implementation_attr(annotations))
         raise DependencyResolvingException("Target is not an asynchronous function")
 
+    def warmup(self, max_workers: Optional[int] = None) -> List[WarmupTiming]:
+        """Create all synchronous singletons in dependency order, independent ones in parallel threads"""
+        return self._resolver.warmup(max_workers)
+
+    async def async_warmup(self) -> List[WarmupTiming]:
+        """Create all singletons in dependency order, independent ones concurrently"""
+        return await self._resolver.async_warmup()
+
+    def freeze(self) -> "FrozenContainer":
+        """Get a validated read-only copy of the container with all resolution plans compiled"""
+        return FrozenContainer(self)
+
+    def create_child(self) -> "ChildContainer":
+        """Get a container that inherits dependencies and singletons, and can add or replace dependencies"""
+        return ChildContainer(self)
+
+    def inject(self, target: Callable[..., T]) -> Callable[..., T]:
+        """Decorator that resolves arguments not passed by the caller from the container"""
+        return _get_injected(target, lambda: self)
+
+    def scope(self) -> DependencyScope:
+        """Context manager in which context scoped dependencies are created once and released on exit"""
+        return self._resolver.create_scope()
+
+    def close(self) -> None:
+        """Finalize resources created outside of scopes and drop singletons"""
+        self._resolver.close()
+
+    async def aclose(self) -> None:
+        """Finalize synchronous and asynchronous resources created outside of scopes and drop singletons"""
+        await self._resolver.aclose()
+
+    def enable_stats(self, is_enabled: bool = True) -> None:
+        """Record count, time and cache hits of each dependency resolution"""
+        self._resolver.enable_stats(is_enabled)
+
+    def stats(self) -> List[DependencyStats]:
+        """Get snapshot of resolution statistics recorded since they were enabled"""
+        return self._resolver.get_stats()
+
+    def enable_codegen(self, is_enabled: bool = True) -> None:
+        """Create transients with generated Python functions calling constructors of their dependencies directly"""
+        self._resolver.enable_codegen(is_enabled)
+
+    def get_source(self, annotation: Any) -> Optional[str]:
+        """Get generated source of the function that creates the first dependency of annotation"""
+        return self._resolver.get_source(annotation)
+
+    def _get_attributes(self, annotations: Tuple[Tuple[str, Any]]) -> Dict[str, Any]:
+        return self._resolver.get_attributes_provider(annotations)()
+
+    async def _get_async_attributes(self, annotations: Tuple[Tuple[str, Any]]) -> Dict[str, Any]:
+        return await self._resolver.get_async_attributes_provider(annotations)()
+
     def override(
         self,
         annotation: Any,
@@ -131,3 +198,174 @@ class Container(IContainer, ContextInstanceMixin):
 
     def __len__(self) -> int:
         return len(self._dependency_storage)
+
+
+class FrozenContainer(Container):
+    """Container whose dependencies cannot be added, only overridden"""
+
+    def __init__(self, container: Container) -> None:
+        self._dependency_storage = FrozenDependencyStorage(container._dependency_storage, {Container: self})
+        self._resolver = Resolver(self._dependency_storage)
+        self._resolver.validate()
+
+        self._overlay = self._dependency_storage.overlay_context
+        self._frozen_plans: Dict[Any, ResolutionPlan] = {}
+        self._compile_frozen_plans()
+        self._dependency_storage.subscribe(self._on_dependencies_changed)
+        Container.set_current(self)
+
+    def _compile_frozen_plans(self) -> None:
+        self._frozen_plans = {}
+        for annotation in self._dependency_storage.get_annotations():
+            plan = self._resolver.get_plan(annotation)
+            plan.complete()
+            self._frozen_plans[annotation] = plan
+            if isinstance(annotation, tuple):
+                for wrapper in self._dependency_storage.get_dependencies_by_annotation(annotation):
+                    self._frozen_plans[wrapper.type_] = plan
+        self._plans = self._frozen_plans
+
+    def _on_dependencies_changed(self) -> None:
+        # compiled plans are shared by reference, so global overrides get a new table that falls back to the resolver
+        if self._dependency_storage.is_overridden:
+            self._plans = {}
+        elif not self._frozen_plans:
+            self._compile_frozen_plans()
+        else:
+            self._plans = self._frozen_plans
+
+    def _reset_frozen_plans(self) -> None:
+        # plans compiled during an override would keep it, so they are compiled again after its release
+        self._frozen_plans = {}
+        self._on_dependencies_changed()
+
+    def enable_stats(self, is_enabled: bool = True) -> None:
+        """Record count, time and cache hits of each dependency resolution"""
+        super().enable_stats(is_enabled)
+        self._reset_frozen_plans()
+
+    def enable_codegen(self, is_enabled: bool = True) -> None:
+        """Create transients with generated Python functions calling constructors of their dependencies directly"""
+        super().enable_codegen(is_enabled)
+        self._reset_frozen_plans()
+
+    def close(self) -> None:
+        """Finalize resources created outside of scopes and drop singletons"""
+        super().close()
+        if self._resolver.is_codegen_enabled:
+            self._reset_frozen_plans()
+
+    async def aclose(self) -> None:
+        """Finalize synchronous and asynchronous resources created outside of scopes and drop singletons"""
+        await super().aclose()
+        if self._resolver.is_codegen_enabled:
+            self._reset_frozen_plans()
+
+    def get(self, annotation):
+        """Get object from container"""
+        plan = self._plans.get(annotation, None)
+        if plan is None or self._overlay.get() is not None:
+            return super().get(annotation)
+
+        dependency = plan.first()
+        if dependency is NOT_FOUND:
+            raise DependencyNotFound("Dependency not found")
+        return dependency
+
+    def get_all(self, annotation, limit=None):
+        """Get all object from container, or only the first limit of them"""
+        plan = self._plans.get(annotation, None)
+        if plan is None or self._overlay.get() is not None:
+            return super().get_all(annotation, limit)
+        return plan.all(limit)
+
+    def freeze(self) -> "FrozenContainer":
+        """Get a validated read-only copy of the container with all resolution plans compiled"""
+        return self
+
+
+class ChildContainer(Container):
+    """Container that resolves dependencies not added to it from its parent"""
+
+    def __init__(self, parent: Container) -> None:
+        self._dependency_storage = ChildDependencyStorage(
+            parent._dependency_storage, is_lazy=parent._dependency_storage._is_lazy
+        )
+        self._resolver = Resolver(self._dependency_storage, parent._resolver)
+
+        # children are often created per request or tenant, so they do not replace the current container
+        self.add_constant(Container, self)
+
+
+def _get_current_container() -> Container:
+    container = Container.get_current()
+    if container is None:
+        raise DependencyResolvingException("There is no current container")
+    return container
+
+
+def _get_injected(target: Callable[..., T], get_container: Callable[[], Container]) -> Callable[..., T]:
+    annotations = signature_cache.get(target)
+    if annotations is None:
+        raise DependencyResolvingException("Failed to get target attributes")
+    parameters = inspect.signature(target).parameters
+    # parameters with defaults are left to the target when the caller does not pass them
+    annotations = tuple(  # type: ignore
+        (name, annotation)
+        for name, annotation in annotations
+        if name != "self" and (name not in parameters or parameters[name].default is inspect.Parameter.empty)
+    )
+
+    positional_names = tuple(
+        name
+        for name, parameter in parameters.items()
+        if parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    )
+    missing_annotations: Dict[Tuple[int, Tuple[str, ...]], Tuple[Tuple[str, Any]]] = {}
+
+    def get_missing_annotations(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Tuple[str, Any]]:
+        if not args and not kwargs:
+            return annotations  # type: ignore
+
+        key = (len(args), tuple(kwargs))
+        missing = missing_annotations.get(key, None)
+        if missing is None:
+            passed_names = set(positional_names[:len(args)])
+            passed_names.update(kwargs)
+            missing = tuple((name, annotation) for name, annotation in annotations if name not in passed_names)  # type: ignore
+            missing_annotations[key] = missing  # type: ignore
+        return missing
+
+    def get_attributes(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        missing = get_missing_annotations(args, kwargs)
+        if not missing:
+            return kwargs
+        attributes = get_container()._get_attributes(missing)
+        attributes.update(kwargs)
+        return attributes
+
+    if is_coroutine_callable(target):
+        async def get_async_attributes(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+            missing = get_missing_annotations(args, kwargs)
+            if not missing:
+                return kwargs
+            attributes = await get_container()._get_async_attributes(missing)
+            attributes.update(kwargs)
+            return attributes
+
+        @wraps(target)
+        async def async_injected(*args: Any, **kwargs: Any) -> Any:
+            return await target(*args, **await get_async_attributes(args, kwargs))  # type: ignore
+
+        return async_injected  # type: ignore
+
+    @wraps(target)
+    def injected(*args: Any, **kwargs: Any) -> Any:
+        return target(*args, **get_attributes(args, kwargs))
+
+    return injected
+
+
+def inject(target: Callable[..., T]) -> Callable[..., T]:
+    """Decorator that resolves arguments not passed by the caller from the current container"""
+    return _get_injected(target, _get_current_container)
@@ -4,3 +4,7 @@ class DependencyNotFound(Exception):
 
 class DependencyResolvingException(Exception):
     pass
+
+
+class ContainerFrozenException(Exception):
+    pass
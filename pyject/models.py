@@ -1,8 +1,13 @@
+from importlib import import_module
+from threading import RLock, Lock
 from typing import Any, Optional, Tuple
 
 from enum import IntEnum
 from dataclasses import dataclass
 
+from pyject.annotations import signature_cache
+from pyject.utils import get_typing_args
+
 
 class Scope(IntEnum):
     SINGLETON: int = 0
@@ -10,11 +15,171 @@ class Scope(IntEnum):
     CONTEXT: int = 2
 
 
-@dataclass
+NOT_PARSED: Any = object()
+
+
+class LazyImport:
+    """Reference to an object by "package.module:Name" path that is imported on first use"""
+
+    __slots__ = ("path", "_object")
+
+    def __init__(self, path: str) -> None:
+        module_name, separator, name = path.partition(":")
+        if not separator or not module_name or not name:
+            raise ValueError(f"Import path must look like 'package.module:Name', not {path!r}")
+        self.path = path
+        self._object = NOT_PARSED
+
+    def load(self) -> Any:
+        """Import the referenced object"""
+        loaded_object = self._object
+        if loaded_object is NOT_PARSED:
+            module_name, _, name = self.path.partition(":")
+            loaded_object = import_module(module_name)
+            for attribute in name.split("."):
+                loaded_object = getattr(loaded_object, attribute)
+            self._object = loaded_object
+        return loaded_object
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.path == other.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({self.path!r})"
+
+
+# wrappers are shared between resolvers of related containers, so their locks are created under a global one
+_wrapper_lock_creation = Lock()
+
+
 class DependencyWrapper:
+    __slots__ = ("type_", "_target", "_annotations", "scope", "cache", "type_arguments", "lock")
+
+    def __init__(
+        self,
+        type_: Any,
+        target: Any,
+        annotations: Optional[Tuple[Tuple[str, Any]]] = None,
+        scope: int = Scope.TRANSIENT,
+        cache: Optional[Any] = None,
+        type_arguments: Tuple = (),
+        lock: Optional[RLock] = None,
+    ) -> None:
+        self.type_ = type_
+        self._target = target
+        self._annotations = annotations
+        self.scope = scope
+        self.cache = cache
+        self.type_arguments = type_arguments
+        self.lock = lock
+
+    @property
+    def target(self) -> Any:
+        target = self._target
+        if target.__class__ is LazyImport:
+            target = target.load()
+            self._target = target
+        return target
+
+    @target.setter
+    def target(self, value: Any) -> None:
+        self._target = value
+
+    @property
+    def is_lazy(self) -> bool:
+        """Whether the target annotations have not been parsed yet"""
+        return self._annotations is NOT_PARSED
+
+    @property
+    def annotations(self) -> Optional[Tuple[Tuple[str, Any]]]:
+        annotations = self._annotations
+        if annotations is NOT_PARSED:
+            annotations = signature_cache.get(self.target)
+            self._annotations = annotations
+            try:
+                _checking_for_finding_itself_in_annotations(self)
+            except Exception:
+                self._annotations = NOT_PARSED
+                raise
+        return annotations
+
+    @annotations.setter
+    def annotations(self, value: Optional[Tuple[Tuple[str, Any]]]) -> None:
+        self._annotations = value
+
+    def get_lock(self) -> RLock:
+        """Get the lock guarding creation of the singleton, created on first use"""
+        lock = self.lock
+        if lock is None:
+            with _wrapper_lock_creation:
+                lock = self.lock
+                if lock is None:
+                    lock = RLock()
+                    self.lock = lock
+        return lock
+
+    def copy(self) -> "DependencyWrapper":
+        """Get wrapper of the same dependency with its own singleton cache, constants keep their value"""
+        cache = self.cache if self._annotations is None else None
+        return DependencyWrapper(
+            type_=self.type_,
+            target=self._target,
+            annotations=self._annotations,
+            scope=self.scope,
+            cache=cache,
+            type_arguments=self.type_arguments,
+        )
+
+    def _astuple(self) -> Tuple[Any, ...]:
+        return self.type_, self._target, self._annotations, self.scope, self.cache, self.type_arguments
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        annotations = "<not parsed>" if self.is_lazy else repr(self._annotations)
+        return (
+            f"{self.__class__.__qualname__}(type_={self.type_!r}, target={self._target!r}, "
+            f"annotations={annotations}, scope={self.scope!r}, cache={self.cache!r}, "
+            f"type_arguments={self.type_arguments!r})"
+        )
+
+
+def _checking_for_finding_itself_in_annotations(wrapper: DependencyWrapper) -> None:
+    error = Exception("Dependency cannot have itself in annotations")
+    if not wrapper.type_arguments and wrapper.annotations is not None:
+        for annotation in wrapper.annotations:
+            annotation_args = get_typing_args(annotation[1])
+            if not annotation_args and annotation[1] == wrapper.type_:
+                raise error
+            else:
+                for annotation_arg in annotation_args:
+                    if annotation_arg == wrapper.type_:
+                        raise error
+
+
+@dataclass
+class WarmupTiming:
+    type_: Any
+    target: Any
+    seconds: float
+
+
+@dataclass
+class DependencyStats:
     type_: Any
     target: Any
-    annotations: Optional[Tuple[Tuple[str, Any]]] = None
-    scope: int = Scope.TRANSIENT
-    cache: Optional[Any] = None
-    type_arguments: Tuple = ()
+    scope: Scope
+    count: int = 0
+    cache_hits: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
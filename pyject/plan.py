@@ -0,0 +1,111 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple, Iterator, List, Optional
+
+NOT_FOUND = object()
+
+
+class BaseResolutionPlan:
+    __slots__ = ("typing", "providers", "compile_compatible")
+
+    def __init__(
+        self,
+        typing: Any,
+        providers: Tuple[Callable[[], Any], ...] = (),
+        compile_compatible: Optional[Callable[[], None]] = None
+    ) -> None:
+        self.typing = typing
+        # providers of dependencies added under compatible annotations are compiled once they are needed
+        self.providers = providers
+        self.compile_compatible = compile_compatible
+
+    def complete(self) -> Tuple[Callable[[], Any], ...]:
+        """Compile providers of dependencies added under compatible annotations if it was not done yet"""
+        compile_compatible = self.compile_compatible
+        if compile_compatible is not None:
+            compile_compatible()
+        return self.providers
+
+    def _get_providers(self, limit: Optional[int] = None) -> Tuple[Callable[[], Any], ...]:
+        providers = self.providers
+        if self.compile_compatible is not None and (limit is None or len(providers) < limit):
+            providers = self.complete()
+        if limit is not None:
+            return providers[:limit]
+        return providers
+
+    def __len__(self) -> int:
+        return len(self.complete())
+
+    def __bool__(self) -> bool:
+        return bool(self.providers) or bool(self.complete())
+
+
+class ResolutionPlan(BaseResolutionPlan):
+    """Compiled providers of all dependencies that satisfy one annotation"""
+
+    __slots__ = ()
+
+    def first(self, default: Any = NOT_FOUND) -> Any:
+        """Get the first resolved dependency or default if there is none"""
+        providers = self.providers
+        if not providers and self.compile_compatible is not None:
+            providers = self.complete()
+        if providers:
+            return providers[0]()
+        return default
+
+    def all(self, limit: Optional[int] = None) -> List[Any]:
+        """Get all resolved dependencies or the first limit of them"""
+        return [provider() for provider in self._get_providers(limit)]
+
+    def __iter__(self) -> Iterator[Any]:
+        providers = self.providers
+        for provider in providers:
+            yield provider()
+        # the first dependencies are resolved before compatible annotations are even searched
+        for provider in self.complete()[len(providers):]:
+            yield provider()
+
+
+class AsyncResolutionPlan(BaseResolutionPlan):
+    """Compiled asynchronous providers of all dependencies that satisfy one annotation"""
+
+    __slots__ = ()
+
+    async def first(self, default: Any = NOT_FOUND) -> Any:
+        """Get the first resolved dependency or default if there is none"""
+        providers = self.providers
+        if not providers and self.compile_compatible is not None:
+            providers = self.complete()
+        if providers:
+            return await providers[0]()
+        return default
+
+    async def all(self, limit: Optional[int] = None) -> List[Any]:
+        """Get all resolved dependencies or the first limit of them, resolving them concurrently"""
+        return list(await asyncio.gather(*[provider() for provider in self._get_providers(limit)]))
+
+
+class PlanCache:
+    """Compiled plans and providers valid for one set of dependencies"""
+
+    __slots__ = (
+        "plans",
+        "attributes_providers",
+        "providers",
+        "async_plans",
+        "async_attributes_providers",
+        "async_providers",
+        "version",
+        "dependencies_version",
+    )
+
+    def __init__(self, version: int = 0, dependencies_version: int = 0) -> None:
+        self.plans: Dict[Any, ResolutionPlan] = {}
+        self.attributes_providers: Dict[Tuple[Tuple[str, Any]], Callable[[], Dict[str, Any]]] = {}
+        self.providers: Dict[int, Callable[[], Any]] = {}
+        self.async_plans: Dict[Any, AsyncResolutionPlan] = {}
+        self.async_attributes_providers: Dict[Tuple[Tuple[str, Any]], Callable[[], Awaitable[Dict[str, Any]]]] = {}
+        self.async_providers: Dict[int, Callable[[], Awaitable[Any]]] = {}
+        self.version = version
+        self.dependencies_version = dependencies_version
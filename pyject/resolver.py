@@ -1,22 +1,45 @@
-from contextvars import ContextVar
-from typing import Dict, Any, TypeVar, Iterator, Tuple, Optional, List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from dataclasses import replace
+from threading import RLock, Lock
+from time import perf_counter
+from typing import Dict, Any, TypeVar, Iterator, Tuple, Optional, List, Callable, Awaitable, Set
 
-from pyject.models import Scope, DependencyWrapper
+from pyject.models import Scope, DependencyWrapper, WarmupTiming, DependencyStats
+from pyject.annotations import annotation_keys
 from pyject.base import IResolver
-from pyject.collections import DependencyStorage, ConditionCollections
-from pyject.utils import _check_annotation
+from pyject.exception import DependencyResolvingException
+from pyject.collections import DependencyStorage, ConditionCollections, DependentsIndex
+from pyject.codegen import FactorySource, get_source
+from pyject.plan import NOT_FOUND, ResolutionPlan, AsyncResolutionPlan, BaseResolutionPlan, PlanCache
+from pyject.scope import DependencyScope
+from pyject.resources import Finalizers, get_resource_kind, is_async_resource, enter_resource, async_enter_resource
+from pyject.utils import is_coroutine_callable
 from pyject.conditions import DefaultCondition, AnyCondition, CollectionCondition, UnionCondition, IteratorCondition, \
-    ForwardRefCondition, GenericCondition
+    ForwardRefCondition, ProviderCondition, GenericCondition
 
 T = TypeVar("T")
 
+AttributesProvider = Callable[[], Dict[str, Any]]
+AsyncAttributesProvider = Callable[[], Awaitable[Dict[str, Any]]]
+
 
 class Resolver(IResolver):
     def __init__(
         self,
         dependency_storage: DependencyStorage,
+        parent: Optional["Resolver"] = None,
     ) -> None:
         self._dependency_storage = dependency_storage
+        self._parent = parent
+        self._overlay = dependency_storage.overlay_context
+        self._change_counter = dependency_storage.change_counter
+        self._plan_cache = PlanCache(dependencies_version=self._change_counter.value)
+        self._pending_plans: Optional[Dict[Any, ResolutionPlan]] = None
+        self._pending_async_plans: Optional[Dict[Any, AsyncResolutionPlan]] = None
+        self._compile_lock = RLock()
+
         self._condition_collections = ConditionCollections(
             self,
             dependency_storage,
@@ -26,75 +49,880 @@ class Resolver(IResolver):
                 UnionCondition,
                 IteratorCondition,
                 ForwardRefCondition,
+                ProviderCondition,
                 GenericCondition
             ],
             default_condition=DefaultCondition
         )
-        self._context_dependencies = ContextVar(f"_context_storage_{id(self)}")
-
-    def _add_scoped_dependency(self, wrapper: DependencyWrapper, resolved_dependency: Any) -> None:
-        if wrapper.type_arguments:
-            name_in_store = (wrapper.type_, wrapper.type_arguments)
-        else:
-            name_in_store = wrapper.type_
-
-        context_dependencies = self._context_dependencies.get(None)
-        if context_dependencies is None:
-            new_context_dependencies = {name_in_store: [resolved_dependency]}
-            self._context_dependencies.set(new_context_dependencies)
-        else:
-            dependencies = context_dependencies.get(name_in_store, None)
-            if dependencies is None:
-                context_dependencies[name_in_store] = [resolved_dependency]
+        self._context_scope: ContextVar[DependencyScope] = ContextVar(f"_context_scope_{id(self)}")
+        self._finalizers = Finalizers()
+        self._stats: Optional[Dict[int, DependencyStats]] = None
+        self._stats_lock = Lock()
+        self._is_codegen_enabled = False
+        self._is_context_scope_used = False
+        self._dependents: Optional[DependentsIndex] = None
+        self._dependents_version = -1
+        self._dependents_cache: Dict[Any, List[DependencyWrapper]] = {}
+        self._unparsed_wrappers: List[DependencyWrapper] = []
+        self._dependency_storage.subscribe(self.clear_plans)
+        self._dependency_storage.set_dependents_finder(self.get_dependents)
+
+    def create_scope(self) -> DependencyScope:
+        """Create scope that holds context scoped dependencies until it is exited"""
+        return DependencyScope(self._context_scope)
+
+    def _get_scope(self) -> DependencyScope:
+        scope = self._context_scope.get(None)
+        if scope is None or (scope.is_implicit and scope.finalizers is not self._finalizers):
+            # outside of an explicit scope dependencies live as long as the current context
+            # and resources created in it are finalized when the container is closed
+            scope = DependencyScope(self._context_scope, self._finalizers)
+            self._context_scope.set(scope)
+        return scope
+
+    def close(self) -> None:
+        """Finalize resources created outside of scopes and drop singletons"""
+        self._finalizers.close()
+        self._reset_implicit_scopes()
+        self._drop_singletons()
+
+    async def aclose(self) -> None:
+        """Finalize synchronous and asynchronous resources created outside of scopes and drop singletons"""
+        await self._finalizers.aclose()
+        self._reset_implicit_scopes()
+        self._drop_singletons()
+
+    def _reset_implicit_scopes(self) -> None:
+        # implicit scopes of other contexts still hold the old finalizers, so they are replaced on their next use
+        self._finalizers = Finalizers()
+        scope = self._context_scope.get(None)
+        if scope is not None and scope.is_implicit:
+            scope.dependencies = {}
+
+    def _get_finalizers_provider(self, wrapper: DependencyWrapper) -> Callable[[], Finalizers]:
+        if wrapper.scope == Scope.SINGLETON:
+            return lambda: self._finalizers
+        if wrapper.scope == Scope.CONTEXT:
+            return lambda: self._get_scope().finalizers
+
+        target = wrapper.target
+
+        def get_scope_finalizers() -> Finalizers:
+            # finalizers of the container would keep each transient until it is closed
+            scope = self._context_scope.get(None)
+            if scope is None or scope.is_implicit:
+                raise DependencyResolvingException(f"Transient resource {target} can only be resolved in a scope")
+            return scope.finalizers
+
+        return get_scope_finalizers
+
+    def _drop_singletons(self) -> None:
+        self._dependency_storage.clear_cache()
+        if self._is_codegen_enabled:
+            # generated factories hold created singletons as constants, also in plans of children
+            self._dependency_storage.notify()
+
+    def _prepare_context_dependencies(self) -> None:
+        # tasks run in a copy of the context, so the scope must exist before they start to be shared with them,
+        # but without context dependencies it would only add an entry to the context of each caller
+        if self._is_context_scope_used:
+            self._get_scope()
+
+    def clear_plans(self) -> None:
+        """Drop compiled resolution plans"""
+        with self._compile_lock:
+            # the version is read first, so that dependencies added meanwhile drop the new plans too
+            dependencies_version = self._change_counter.value
+            self._plan_cache = PlanCache(self._plan_cache.version + 1, dependencies_version)
+
+    def _get_plan_cache(self) -> PlanCache:
+        # added dependencies are only counted by the storage, plans compiled before are dropped on the next lookup
+        if self._plan_cache.dependencies_version != self._change_counter.value:
+            self.clear_plans()
+        overlay = self._overlay.get()
+        if overlay is None:
+            return self._plan_cache
+
+        # plans compiled with overridden dependencies live as long as the overlay
+        plan_cache = overlay.plan_cache
+        if plan_cache is None or plan_cache.version != self._plan_cache.version:
+            plan_cache = PlanCache(self._plan_cache.version)
+            overlay.plan_cache = plan_cache
+        return plan_cache
+
+    def enable_stats(self, is_enabled: bool = True) -> None:
+        """Recompile plans with providers that record resolution statistics or without them"""
+        with self._compile_lock:
+            if is_enabled and self._stats is None:
+                self._stats = {}
+            elif not is_enabled:
+                self._stats = None
+            self.clear_plans()
+
+    @property
+    def is_codegen_enabled(self) -> bool:
+        """Whether transient providers are generated as Python source"""
+        return self._is_codegen_enabled
+
+    def enable_codegen(self, is_enabled: bool = True) -> None:
+        """Recompile plans with transient providers generated as Python source or without them"""
+        with self._compile_lock:
+            self._is_codegen_enabled = is_enabled
+            self.clear_plans()
+
+    def get_stats(self) -> List[DependencyStats]:
+        """Get snapshot of recorded resolution statistics"""
+        if self._stats is None:
+            return []
+        with self._stats_lock:
+            return [replace(stats) for stats in self._stats.values()]
+
+    def _get_stats(self, wrapper: DependencyWrapper) -> DependencyStats:
+        stats = self._stats.get(id(wrapper), None)  # type: ignore
+        if stats is None:
+            stats = DependencyStats(type_=wrapper.type_, target=wrapper.target, scope=wrapper.scope)
+            self._stats[id(wrapper)] = stats  # type: ignore
+        return stats
+
+    def _is_cached(self, wrapper: DependencyWrapper) -> Callable[[], bool]:
+        if wrapper.annotations is None:
+            return lambda: True
+        if wrapper.scope == Scope.SINGLETON:
+            return lambda: wrapper.cache is not None
+        if wrapper.scope == Scope.CONTEXT:
+            key = id(wrapper)
+
+            def is_in_scope() -> bool:
+                scope = self._context_scope.get(None)
+                return scope is not None and key in scope.dependencies
+
+            return is_in_scope
+        return lambda: False
+
+    def _record(self, stats: DependencyStats, is_cached: bool, seconds: float) -> None:
+        with self._stats_lock:
+            if is_cached:
+                stats.cache_hits += 1
+                return
+            stats.count += 1
+            stats.total_seconds += seconds
+            if seconds > stats.max_seconds:
+                stats.max_seconds = seconds
+
+    def _instrument(self, wrapper: DependencyWrapper, provider: Callable[[], Any]) -> Callable[[], Any]:
+        stats = self._get_stats(wrapper)
+        is_cached = self._is_cached(wrapper)
+        record = self._record
+
+        def get_instrumented() -> Any:
+            cached = is_cached()
+            start = perf_counter()
+            dependency = provider()
+            record(stats, cached, perf_counter() - start)
+            return dependency
+
+        return get_instrumented
+
+    def _instrument_async(
+        self, wrapper: DependencyWrapper, provider: Callable[[], Awaitable[Any]]
+    ) -> Callable[[], Awaitable[Any]]:
+        stats = self._get_stats(wrapper)
+        is_cached = self._is_cached(wrapper)
+        record = self._record
+
+        async def get_instrumented() -> Any:
+            cached = is_cached()
+            start = perf_counter()
+            dependency = await provider()
+            record(stats, cached, perf_counter() - start)
+            return dependency
+
+        return get_instrumented
+
+    def get_plan(self, typing: Any) -> ResolutionPlan:
+        """Get compiled resolution plan for typing"""
+        plan_cache = self._plan_cache
+        if self._overlay.get() is not None or plan_cache.dependencies_version != self._change_counter.value:
+            plan_cache = self._get_plan_cache()
+        plan = plan_cache.plans.get(typing, None)
+        if plan is not None:
+            return plan
+        return self._compile(self._compile_plan, typing)
+
+    def get_async_plan(self, typing: Any) -> AsyncResolutionPlan:
+        """Get compiled asynchronous resolution plan for typing"""
+        plan = self._get_plan_cache().async_plans.get(typing, None)
+        if plan is not None:
+            return plan
+        return self._compile(self._compile_async_plan, typing)
+
+    def get_shared_provider(self, wrapper: DependencyWrapper) -> Callable[[], Any]:
+        """Get provider of a dependency for child resolvers, ignoring dependencies overridden in the current context"""
+        return self._get_shared(self._get_provider, wrapper)
+
+    def get_shared_async_provider(self, wrapper: DependencyWrapper) -> Callable[[], Awaitable[Any]]:
+        """Get asynchronous provider of a dependency for child resolvers, ignoring context-local overrides"""
+        return self._get_shared(self._get_async_provider, wrapper)
+
+    def _get_shared(self, get_provider: Callable[[DependencyWrapper], T], wrapper: DependencyWrapper) -> T:
+        if self._overlay.get() is None:
+            return self._compile(get_provider, wrapper)
+        # children cache the provider for good, so it must not capture the overlay of the current context
+        context = copy_context()
+        context.run(self._overlay.set, None)
+        return context.run(self._compile, get_provider, wrapper)
+
+    def _compile(self, compile_plan: Callable[..., T], *args: Any) -> T:
+        with self._compile_lock:
+            if self._pending_plans is not None:
+                return compile_plan(*args)
+
+            plan_cache = self._get_plan_cache()
+            self._pending_plans = {}
+            self._pending_async_plans = {}
+            try:
+                plan = compile_plan(*args)
+            except BaseException:
+                plan_cache.providers = {}
+                plan_cache.async_providers = {}
+                raise
             else:
-                dependencies.append(resolved_dependency)
+                plan_cache.plans.update(self._pending_plans)
+                plan_cache.async_plans.update(self._pending_async_plans)
+            finally:
+                self._pending_plans = None
+                self._pending_async_plans = None
+            return plan
+
+    def _compile_plan(self, typing: Any) -> ResolutionPlan:
+        plan = self._get_plan_cache().plans.get(typing, None)
+        if plan is None:
+            plan = self._pending_plans.get(typing, None)  # type: ignore
+        if plan is not None:
+            return plan
+
+        key = annotation_keys.get(typing)
+        if key is not typing:
+            # generics are also planned under themselves, so getting them costs one lookup
+            plan = self._compile_plan(key)
+            self._pending_plans[typing] = plan  # type: ignore
+            return plan
+
+        # the plan is registered before its providers are compiled so that dependency cycles finish
+        plan = ResolutionPlan(typing)
+        self._pending_plans[typing] = plan  # type: ignore
+        plan.providers = tuple(
+            self._get_provider(wrapper) for wrapper in self._dependency_storage.get_dependencies_by_annotation(typing)
+        )
+        plan.compile_compatible = self._get_compatible_compiler(plan, self._get_provider)
+        return plan
+
+    def _compile_async_plan(self, typing: Any) -> AsyncResolutionPlan:
+        plan = self._get_plan_cache().async_plans.get(typing, None)
+        if plan is None:
+            plan = self._pending_async_plans.get(typing, None)  # type: ignore
+        if plan is not None:
+            return plan
+
+        key = annotation_keys.get(typing)
+        if key is not typing:
+            plan = self._compile_async_plan(key)
+            self._pending_async_plans[typing] = plan  # type: ignore
+            return plan
+
+        plan = AsyncResolutionPlan(typing)
+        self._pending_async_plans[typing] = plan  # type: ignore
+        plan.providers = tuple(
+            self._get_async_provider(wrapper)
+            for wrapper in self._dependency_storage.get_dependencies_by_annotation(typing)
+        )
+        plan.compile_compatible = self._get_compatible_compiler(plan, self._get_async_provider)
+        return plan
+
+    def _get_compatible_compiler(
+        self, plan: BaseResolutionPlan, get_provider: Callable[[DependencyWrapper], Any]
+    ) -> Callable[[], None]:
+        overlay = self._overlay.get()
+
+        def compile_compatible() -> None:
+            if self._overlay.get() is overlay:
+                self._compile(self._compile_compatible, plan, get_provider)
+                return
+            # a lazily consumed plan can outlive the override it was compiled with
+            context = copy_context()
+            context.run(self._overlay.set, overlay)
+            context.run(self._compile, self._compile_compatible, plan, get_provider)
+
+        return compile_compatible
+
+    def _compile_compatible(
+        self, plan: BaseResolutionPlan, get_provider: Callable[[DependencyWrapper], Any]
+    ) -> None:
+        if plan.compile_compatible is None:
+            return
+        providers = tuple(
+            get_provider(wrapper) for wrapper in self._dependency_storage.get_compatible_dependencies(plan.typing)
+        )
+        if providers:
+            plan.providers = plan.providers + providers
+        plan.compile_compatible = None
+
+    def _get_provider(self, wrapper: DependencyWrapper) -> Callable[[], Any]:
+        providers = self._get_plan_cache().providers
+        provider = providers.get(id(wrapper), None)
+        if provider is None:
+            provider = self._compile_provider(wrapper)
+            if self._stats is not None:
+                # statistics are recorded by separate providers so that they cost nothing when disabled
+                provider = self._instrument(wrapper, provider)
+            providers[id(wrapper)] = provider
+        return provider
+
+    def _is_parent_singleton(self, wrapper: DependencyWrapper) -> bool:
+        # singletons of the parent are created with its dependencies and shared with all of its children
+        if self._parent is None or wrapper.scope != Scope.SINGLETON:
+            return False
+        return not self._dependency_storage.owns(wrapper)
+
+    def _compile_provider(self, wrapper: DependencyWrapper) -> Callable[[], Any]:
+        target = wrapper.target
+        if wrapper.annotations is None:
+            def get_constant() -> Any:
+                return target
+
+            return get_constant
+
+        if self._is_parent_singleton(wrapper):
+            return self._parent.get_shared_provider(wrapper)  # type: ignore
+
+        resource_kind = get_resource_kind(target)
+        if is_coroutine_callable(target) or is_async_resource(resource_kind):
+            def get_async_dependency() -> Any:
+                # a singleton that has already been created asynchronously can be got synchronously
+                cache = wrapper.cache
+                if cache is not None and wrapper.scope == Scope.SINGLETON:
+                    return cache
+                raise DependencyResolvingException(f"{target} is asynchronous, it can only be resolved asynchronously")
+
+            return get_async_dependency
+
+        if wrapper.scope == Scope.TRANSIENT and resource_kind is None and self._is_codegen_enabled:
+            # statistics are recorded per provider, so generated factories would hide nested dependencies
+            if self._stats is None:
+                return self._generate_provider(wrapper)
+
+        get_attributes = self._compile_attributes(wrapper.annotations)
+        get_scope = self._get_scope
+        get_finalizers = self._get_finalizers_provider(wrapper)
+
+        def create() -> Any:
+            if resource_kind is None:
+                return target(**get_attributes())
+            finalizers = get_finalizers()
+            return enter_resource(resource_kind, target(**get_attributes()), finalizers)
+
+        overlay = self._overlay.get()
+        if wrapper.scope == Scope.SINGLETON and overlay is not None and overlay.is_local(wrapper):
+            key = id(wrapper)
+            singletons = overlay.singletons
+
+            def get_local_singleton() -> Any:
+                resolved_dependency = singletons.get(key, NOT_FOUND)
+                if resolved_dependency is NOT_FOUND:
+                    if not overlay.is_clear_cache and wrapper.cache is not None:
+                        resolved_dependency = wrapper.cache
+                    else:
+                        resolved_dependency = create()
+                    resolved_dependency = singletons.setdefault(key, resolved_dependency)
+                return resolved_dependency
+
+            return get_local_singleton
+        elif wrapper.scope == Scope.SINGLETON:
+            lock = wrapper.get_lock()
+
+            def get_singleton() -> Any:
+                cache = wrapper.cache
+                if cache is not None:
+                    return cache
+
+                with lock:
+                    cache = wrapper.cache
+                    if cache is not None:
+                        return cache
+                    resolved_dependency = create()
+                    wrapper.cache = resolved_dependency
+                    return resolved_dependency
+
+            return get_singleton
+        elif wrapper.scope == Scope.CONTEXT:
+            key = id(wrapper)
+
+            def get_scoped() -> Any:
+                dependencies = get_scope().dependencies
+                resolved_dependency = dependencies.get(key, NOT_FOUND)
+                if resolved_dependency is NOT_FOUND:
+                    resolved_dependency = dependencies.setdefault(key, create())
+                return resolved_dependency
+
+            return get_scoped
+        elif resource_kind is not None:
+            return create
+
+        def get_transient() -> Any:
+            return target(**get_attributes())
+
+        return get_transient
+
+    def _generate_provider(self, wrapper: DependencyWrapper) -> Callable[[], Any]:
+        source = FactorySource(f"create_{getattr(wrapper.target, '__name__', '')}")
+        return source.compile(self._generate_call(source, wrapper, {id(wrapper)}))
+
+    def get_source(self, typing: Any) -> Optional[str]:
+        """Get generated source of the provider of the first dependency for typing"""
+        plan = self.get_plan(typing)
+        providers = plan.providers or plan.complete()
+        if not providers:
+            return None
+        return get_source(providers[0])
+
+    def _generate_call(self, source: FactorySource, wrapper: DependencyWrapper, path: Set[int]) -> str:
+        target_name = source.bind(wrapper.target, "target_")
+        arguments = {}
+        for name, annotation in wrapper.annotations:  # type: ignore
+            if name != "self":
+                arguments[name] = self._generate_attribute(source, annotation, path)
+        return source.call(target_name, arguments)
+
+    def _generate_attribute(self, source: FactorySource, annotation: Any, path: Set[int]) -> str:
+        if isinstance(self._condition_collections.get_condition(annotation), DefaultCondition):
+            wrappers = self._dependency_storage.get_dependencies_by_annotation(annotation)
+            if wrappers:
+                return self._generate_dependency(source, wrappers[0], path)
+        return f"{source.bind(self._condition_collections.compile(annotation), 'get_')}()"
+
+    def _generate_dependency(self, source: FactorySource, wrapper: DependencyWrapper, path: Set[int]) -> str:
+        if wrapper.annotations is None:
+            return source.bind(wrapper.target, "constant_")
+
+        if wrapper.scope == Scope.TRANSIENT and id(wrapper) not in path and not source.is_full:
+            target = wrapper.target
+            if not is_coroutine_callable(target) and get_resource_kind(target) is None:
+                path.add(id(wrapper))
+                try:
+                    return self._generate_call(source, wrapper, path)
+                finally:
+                    path.discard(id(wrapper))
+
+        overlay = self._overlay.get()
+        if wrapper.scope == Scope.SINGLETON and (overlay is None or not overlay.is_local(wrapper)):
+            cache = wrapper.cache
+            if cache is not None:
+                return source.bind(cache, "singleton_")
+        return f"{source.bind(self._get_provider(wrapper), 'get_')}()"
+
+    def _get_async_provider(self, wrapper: DependencyWrapper) -> Callable[[], Awaitable[Any]]:
+        providers = self._get_plan_cache().async_providers
+        provider = providers.get(id(wrapper), None)
+        if provider is None:
+            provider = self._compile_async_provider(wrapper)
+            if self._stats is not None:
+                provider = self._instrument_async(wrapper, provider)
+            providers[id(wrapper)] = provider
+        return provider
+
+    def _compile_async_provider(self, wrapper: DependencyWrapper) -> Callable[[], Awaitable[Any]]:
+        target = wrapper.target
+        if wrapper.annotations is None:
+            get_dependency = self._compile_provider(wrapper)
+
+            async def get_constant() -> Any:
+                return get_dependency()
+
+            return get_constant
+
+        if self._is_parent_singleton(wrapper):
+            return self._parent.get_shared_async_provider(wrapper)  # type: ignore
+
+        is_async = is_coroutine_callable(target)
+        resource_kind = get_resource_kind(target)
+        get_attributes = self._compile_async_attributes(wrapper.annotations)
+        get_scope = self._get_scope
+        get_finalizers = self._get_finalizers_provider(wrapper)
+
+        async def create() -> Any:
+            if is_async:
+                return await target(**await get_attributes())
+            if resource_kind is not None:
+                finalizers = get_finalizers()
+                return await async_enter_resource(resource_kind, target(**await get_attributes()), finalizers)
+            return target(**await get_attributes())
+
+        overlay = self._overlay.get()
+        if wrapper.scope == Scope.SINGLETON and overlay is not None and overlay.is_local(wrapper):
+            key = id(wrapper)
+            singletons = overlay.singletons
+
+            async def get_local_singleton() -> Any:
+                resolved_dependency = singletons.get(key, NOT_FOUND)
+                if resolved_dependency is NOT_FOUND:
+                    if not overlay.is_clear_cache and wrapper.cache is not None:
+                        resolved_dependency = wrapper.cache
+                    else:
+                        resolved_dependency = await create()
+                    resolved_dependency = singletons.setdefault(key, resolved_dependency)
+                return resolved_dependency
+
+            return get_local_singleton
+        elif wrapper.scope == Scope.SINGLETON:
+            lock = wrapper.get_lock()
+            task: Optional[asyncio.Future] = None
+
+            async def create_singleton() -> Any:
+                nonlocal task
+                try:
+                    if is_async or is_async_resource(resource_kind):
+                        resolved_dependency = await create()
+                    else:
+                        attributes = await get_attributes()
+                        with lock:
+                            if wrapper.cache is not None:
+                                return wrapper.cache
+                            if resource_kind is None:
+                                resolved_dependency = target(**attributes)
+                            else:
+                                resolved_dependency = enter_resource(
+                                    resource_kind, target(**attributes), self._finalizers
+                                )
+                    wrapper.cache = resolved_dependency
+                    return resolved_dependency
+                finally:
+                    task = None
+
+            async def get_singleton() -> Any:
+                nonlocal task
+                cache = wrapper.cache
+                if cache is not None:
+                    return cache
+
+                # concurrent awaiters of a cold singleton share one in-flight task
+                if task is None:
+                    self._prepare_context_dependencies()
+                    task = asyncio.ensure_future(create_singleton())
+                return await asyncio.shield(task)
+
+            return get_singleton
+        elif wrapper.scope == Scope.CONTEXT:
+            self._is_context_scope_used = True
+            key = id(wrapper)
+
+            async def get_scoped() -> Any:
+                dependencies = get_scope().dependencies
+                resolved_dependency = dependencies.get(key, NOT_FOUND)
+                if resolved_dependency is NOT_FOUND:
+                    # siblings resolved concurrently in one scope get the instance that was stored first
+                    resolved_dependency = dependencies.setdefault(key, await create())
+                return resolved_dependency
+
+            return get_scoped
+
+        return create
+
+    def _compile_attributes(self, annotations: Tuple[Tuple[str, Any]]) -> AttributesProvider:
+        providers = tuple(
+            (name, self._condition_collections.compile(annotation)) for name, annotation in annotations if name != "self"
+        )
+
+        def get_attributes() -> Dict[str, Any]:
+            return {name: provider() for name, provider in providers}
+
+        return get_attributes
+
+    def _compile_async_attributes(self, annotations: Tuple[Tuple[str, Any]]) -> AsyncAttributesProvider:
+        names = tuple(name for name, _ in annotations if name != "self")
+        providers = tuple(
+            self._condition_collections.compile_async(annotation) for name, annotation in annotations if name != "self"
+        )
+
+        if len(providers) < 2:
+            async def get_attributes() -> Dict[str, Any]:
+                return {name: await provider() for name, provider in zip(names, providers)}
+
+            return get_attributes
+
+        async def gather_attributes() -> Dict[str, Any]:
+            self._prepare_context_dependencies()
+            return dict(zip(names, await asyncio.gather(*[provider() for provider in providers])))
+
+        return gather_attributes
+
+    def get_attributes_provider(self, annotations: Tuple[Tuple[str, Any]]) -> AttributesProvider:
+        """Get compiled callable that returns resolved signature attributes"""
+        plan_cache = self._get_plan_cache()
+        provider = plan_cache.attributes_providers.get(annotations, None)
+        if provider is not None:
+            return provider
+
+        with self._compile_lock:
+            provider = self._compile_attributes(annotations)
+            plan_cache.attributes_providers[annotations] = provider
+        return provider
+
+    def get_async_attributes_provider(self, annotations: Tuple[Tuple[str, Any]]) -> AsyncAttributesProvider:
+        """Get compiled coroutine function that returns resolved signature attributes"""
+        plan_cache = self._get_plan_cache()
+        provider = plan_cache.async_attributes_providers.get(annotations, None)
+        if provider is not None:
+            return provider
+
+        with self._compile_lock:
+            provider = self._compile_async_attributes(annotations)
+            plan_cache.async_attributes_providers[annotations] = provider
+        return provider
+
+    def _get_first_wrapper(self, typing: Any) -> Optional[DependencyWrapper]:
+        wrappers = self._dependency_storage.get_dependencies_by_annotation(typing)
+        if wrappers:
+            return wrappers[0]
+        for wrapper in self._dependency_storage.get_compatible_dependencies(typing):
+            return wrapper
+        return None
+
+    def get_factory(self, typing: Any) -> Callable[[Dict[str, Any]], Any]:
+        """Get callable creating the first dependency for typing, with passed keyword arguments replacing resolved ones"""
+        key = annotation_keys.get(typing)
+        missing_annotations: Dict[Tuple[Any, Tuple[str, ...]], Tuple[Tuple[str, Any]]] = {}
+
+        def create(kwargs: Dict[str, Any]) -> Any:
+            wrapper = self._get_first_wrapper(key)
+            if wrapper is None:
+                raise DependencyResolvingException(f"There is no such dependency in the container {typing}")
+            target = wrapper.target
+            annotations = wrapper.annotations
+            if annotations is None:
+                raise DependencyResolvingException(f"{target} cannot be created with keyword arguments")
+
+            missing_key = (target, tuple(kwargs))
+            missing = missing_annotations.get(missing_key, None)
+            if missing is None:
+                if is_coroutine_callable(target) or get_resource_kind(target) is not None:
+                    raise DependencyResolvingException(f"{target} cannot be created with keyword arguments")
+                missing = tuple(  # type: ignore
+                    (name, annotation) for name, annotation in annotations if name != "self" and name not in kwargs
+                )
+                missing_annotations[missing_key] = missing  # type: ignore
+            attributes = self.get_attributes_provider(missing)()
+            attributes.update(kwargs)
+            return target(**attributes)
+
+        return create
 
     def get_implementation_attr(self, annotations: Tuple[Tuple[str, Any]]) -> Dict[str, Any]:
         """Get resolved signature attributes"""
-        callable_object_arguments = {}
-        for name, annotation in annotations:
+        return self.get_attributes_provider(annotations)()
+
+    async def get_async_implementation_attr(self, annotations: Tuple[Tuple[str, Any]]) -> Dict[str, Any]:
+        """Get resolved signature attributes resolving asynchronous dependencies"""
+        return await self.get_async_attributes_provider(annotations)()
+
+    def get_dependency_wrappers(self, wrapper: DependencyWrapper) -> List[DependencyWrapper]:
+        """Get dependencies that can be resolved while resolving wrapper"""
+        dependency_wrappers: List[DependencyWrapper] = []
+        if wrapper.annotations is None:
+            return dependency_wrappers
+
+        for name, annotation in wrapper.annotations:
             if name == "self":
                 continue
+            for typing in self._condition_collections.get_dependencies(annotation) or ():
+                dependency_wrappers.extend(self._dependency_storage.get_dependencies_by_annotation(typing))
+                dependency_wrappers.extend(self._dependency_storage.get_compatible_dependencies(typing))
+        return dependency_wrappers
 
-            callable_object_arguments[name] = self._condition_collections.find(annotation)
+    def _index_dependents(self, dependents: DependentsIndex, wrapper: DependencyWrapper) -> None:
+        if wrapper.is_lazy:
+            # lazy annotations are parsed on resolution, so they are indexed once that happened
+            self._unparsed_wrappers.append(wrapper)
+            return
+        if wrapper.annotations is None:
+            return
 
-        return callable_object_arguments
+        for name, annotation in wrapper.annotations:
+            if name == "self":
+                continue
+            typings = self._condition_collections.get_dependencies(annotation)
+            if typings is None:
+                dependents.unknown.append(wrapper)
+                continue
+            for typing in typings:
+                dependents.add(typing, wrapper)
 
-    def _get_implementation(self, dependency_wrapper: DependencyWrapper):
-        if dependency_wrapper.annotations is None:
-            if dependency_wrapper.scope == Scope.CONTEXT:
-                self._add_scoped_dependency(dependency_wrapper.target, dependency_wrapper.target)
-            return dependency_wrapper.target
+    def _get_dependents_index(self) -> DependentsIndex:
+        dependents = self._dependents
+        if dependents is None or self._dependents_version != self._dependency_storage.version:
+            dependents = DependentsIndex()
+            self._unparsed_wrappers = []
+            self._dependents_cache = {}
+            for wrapper in self._dependency_storage.get_registered_dependencies():
+                self._index_dependents(dependents, wrapper)
+            self._dependents = dependents
+            self._dependents_version = self._dependency_storage.version
+        elif self._unparsed_wrappers:
+            unparsed_wrappers, self._unparsed_wrappers = self._unparsed_wrappers, []
+            for wrapper in unparsed_wrappers:
+                self._index_dependents(dependents, wrapper)
+            if len(self._unparsed_wrappers) != len(unparsed_wrappers):
+                self._dependents_cache = {}
+        return dependents
 
-        attr = self.get_implementation_attr(dependency_wrapper.annotations)
-        resolved_dependency = dependency_wrapper.target(**attr)
-        if dependency_wrapper.scope == Scope.SINGLETON:
-            dependency_wrapper.cache = resolved_dependency
-        elif dependency_wrapper.scope == Scope.CONTEXT:
-            self._add_scoped_dependency(dependency_wrapper, resolved_dependency)
-        return resolved_dependency
+    def get_dependents(self, annotation: Any) -> List[DependencyWrapper]:
+        """Get dependencies whose attributes depend on annotation directly or through other dependencies"""
+        with self._compile_lock:
+            indexes = [self._get_dependents_index()]
+            # overriding factories are not registered, so they are indexed only while they are in use
+            overriding_dependents = DependentsIndex()
+            for wrapper in self._dependency_storage.get_overriding_dependencies():
+                if not wrapper.is_lazy:
+                    self._index_dependents(overriding_dependents, wrapper)
+            if overriding_dependents:
+                indexes.append(overriding_dependents)
+            else:
+                # the same list is returned until the index changes, so callers can cache what they derive from it
+                cached = self._dependents_cache.get(annotation, None)
+                if cached is not None:
+                    return cached
 
-    def get_resolved_dependencies(self, typing: Any) -> Iterator[Any]:
-        """Get attributes from container for typing"""
-        context_dependencies = self._context_dependencies.get(None)
-        if context_dependencies is not None:
-            dependencies = context_dependencies.get(typing, None)
-            if dependencies is not None:
-                for dependency in dependencies:
-                    yield dependency
-                return
+            result: List[DependencyWrapper] = []
+            visited: Set[int] = set()
+            visited_aliases = {annotation}
+            aliases = [annotation]
+            while aliases:
+                alias = aliases.pop()
+                alias_type = self._dependency_storage.get_dependency_type(alias)
+                for dependents in indexes:
+                    for typing_dependents in dependents.get(alias, alias_type):
+                        for wrapper in typing_dependents:
+                            if id(wrapper) in visited:
+                                continue
+                            visited.add(id(wrapper))
+                            result.append(wrapper)
 
-        wrappers = self._dependency_storage.get_dependencies_by_annotation(typing)
-        for wrapper in wrappers:
-            yield self._check_and_get_implementation(wrapper)
+                            wrapper_alias = annotation_keys.get(wrapper.type_)
+                            if wrapper_alias not in visited_aliases:
+                                visited_aliases.add(wrapper_alias)
+                                aliases.append(wrapper_alias)
+            if not overriding_dependents:
+                self._dependents_cache[annotation] = result
+            return result
 
-        for dependency_wrapper in self._dependency_storage.get_dependencies(ignore_annotation=typing):
-            if not _check_annotation(typing, dependency_wrapper.type_):
+    def _get_singleton_dependencies(self, wrapper: DependencyWrapper) -> Set[int]:
+        singletons: Set[int] = set()
+        visited: Set[int] = set()
+        dependency_wrappers = self.get_dependency_wrappers(wrapper)
+        while dependency_wrappers:
+            dependency_wrapper = dependency_wrappers.pop()
+            if id(dependency_wrapper) in visited:
                 continue
-            yield self._check_and_get_implementation(dependency_wrapper)
+            visited.add(id(dependency_wrapper))
+
+            if dependency_wrapper.scope == Scope.SINGLETON:
+                singletons.add(id(dependency_wrapper))
+            else:
+                dependency_wrappers.extend(self.get_dependency_wrappers(dependency_wrapper))
+        return singletons
+
+    def get_singleton_levels(self, *, is_async: bool = True) -> List[List[DependencyWrapper]]:
+        """Get singletons that are not created yet, grouped so that each group depends only on the previous ones"""
+        singletons = {
+            id(wrapper): wrapper
+            for wrapper in self._dependency_storage.get_dependencies()
+            if wrapper.scope == Scope.SINGLETON and wrapper.annotations is not None and wrapper.cache is None
+        }
+        dependencies = {}
+        for key, wrapper in singletons.items():
+            dependencies[key] = {
+                dependency for dependency in self._get_singleton_dependencies(wrapper) if dependency != key
+            }
+
+        if not is_async:
+            skipped = {
+                key
+                for key, wrapper in singletons.items()
+                if is_coroutine_callable(wrapper.target) or is_async_resource(get_resource_kind(wrapper.target))
+            }
+            while skipped:
+                for key in skipped:
+                    del dependencies[key]
+                skipped = {key for key, wrapper_dependencies in dependencies.items() if wrapper_dependencies & skipped}
+
+        for wrapper_dependencies in dependencies.values():
+            wrapper_dependencies.intersection_update(dependencies)
+
+        levels = []
+        while dependencies:
+            level = [key for key, wrapper_dependencies in dependencies.items() if not wrapper_dependencies]
+            if not level:
+                # cyclic singletons are created one by one, resolving each other on demand
+                levels.extend([singletons[key]] for key in dependencies)
+                break
+
+            for key in level:
+                del dependencies[key]
+            for wrapper_dependencies in dependencies.values():
+                wrapper_dependencies.difference_update(level)
+            levels.append([singletons[key] for key in level])
+        return levels
+
+    def warmup(self, max_workers: Optional[int] = None) -> List[WarmupTiming]:
+        """Create all synchronous singletons in dependency order, independent ones in parallel threads"""
+        levels = self.get_singleton_levels(is_async=False)
+        with self._compile_lock:
+            providers = {id(wrapper): self._get_provider(wrapper) for level in levels for wrapper in level}
+
+        def create(wrapper: DependencyWrapper) -> WarmupTiming:
+            start = perf_counter()
+            providers[id(wrapper)]()
+            return WarmupTiming(type_=wrapper.type_, target=wrapper.target, seconds=perf_counter() - start)
+
+        timings = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for level in levels:
+                timings.extend(executor.map(create, level))
+        return timings
+
+    async def async_warmup(self) -> List[WarmupTiming]:
+        """Create all singletons in dependency order, independent ones concurrently"""
+        levels = self.get_singleton_levels()
+        with self._compile_lock:
+            providers = {id(wrapper): self._get_async_provider(wrapper) for level in levels for wrapper in level}
+
+        async def create(wrapper: DependencyWrapper) -> WarmupTiming:
+            start = perf_counter()
+            await providers[id(wrapper)]()
+            return WarmupTiming(type_=wrapper.type_, target=wrapper.target, seconds=perf_counter() - start)
+
+        timings = []
+        for level in levels:
+            timings.extend(await asyncio.gather(*[create(wrapper) for wrapper in level]))
+        return timings
+
+    def validate(self) -> None:
+        """Check that attributes of every dependency in the storage can be resolved"""
+        for wrapper in self._dependency_storage.get_dependencies():
+            if wrapper.annotations is None:
+                continue
+
+            for name, annotation in wrapper.annotations:
+                if name == "self":
+                    continue
+                try:
+                    self._condition_collections.validate(annotation)
+                except DependencyResolvingException as e:
+                    raise DependencyResolvingException(f"Failed to resolve {name!r} of {wrapper.target}: {e}") from e
+
+    def get_resolved_dependencies(self, typing: Any) -> Iterator[Any]:
+        """Get attributes from container for typing, resolving each one when it is consumed"""
+        return iter(self.get_plan(typing))
 
-    def _check_and_get_implementation(self, dependency_wrapper: DependencyWrapper) -> Any:
-        if dependency_wrapper.cache is not None and dependency_wrapper.scope == Scope.SINGLETON:
-            return dependency_wrapper.cache
-        else:
-            return self._get_implementation(dependency_wrapper)
+    def get_all_resolved_dependencies(self, typing: Any, limit: Optional[int] = None) -> List[Any]:
+        """Get list of all attributes from container for typing or the first limit of them"""
+        return self.get_plan(typing).all(limit)
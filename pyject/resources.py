@@ -0,0 +1,126 @@
+import inspect
+from enum import IntEnum
+from functools import partial
+from typing import Any, Callable, List, Optional, Tuple, Iterator, AsyncIterator
+
+from pyject.exception import DependencyResolvingException
+
+
+class ResourceKind(IntEnum):
+    GENERATOR: int = 0
+    ASYNC_GENERATOR: int = 1
+    CONTEXT_MANAGER: int = 2
+    ASYNC_CONTEXT_MANAGER: int = 3
+
+
+def get_resource_kind(target: Any) -> Optional[ResourceKind]:
+    """Get kind of factory whose result must be finalized, None for ordinary factories"""
+    if inspect.isclass(target):
+        # classes are constructed as they are even if they are context managers
+        return None
+
+    if inspect.isgeneratorfunction(target):
+        return ResourceKind.GENERATOR
+    if inspect.isasyncgenfunction(target):
+        return ResourceKind.ASYNC_GENERATOR
+
+    # functions decorated with contextmanager/asynccontextmanager wrap a generator function
+    wrapped = getattr(target, "__wrapped__", None)
+    if wrapped is not None:
+        if inspect.isgeneratorfunction(wrapped):
+            return ResourceKind.CONTEXT_MANAGER
+        if inspect.isasyncgenfunction(wrapped):
+            return ResourceKind.ASYNC_CONTEXT_MANAGER
+    return None
+
+
+def is_async_resource(resource_kind: Optional[ResourceKind]) -> bool:
+    return resource_kind == ResourceKind.ASYNC_GENERATOR or resource_kind == ResourceKind.ASYNC_CONTEXT_MANAGER
+
+
+class Finalizers:
+    """Teardown callbacks of created resources that are called in reverse creation order"""
+
+    __slots__ = ("_callbacks",)
+
+    def __init__(self) -> None:
+        self._callbacks: List[Tuple[Callable[[], Any], bool]] = []
+
+    def add(self, callback: Callable[[], Any], is_async: bool = False) -> None:
+        self._callbacks.append((callback, is_async))
+
+    def close(self) -> None:
+        """Call teardown callbacks, asynchronous resources can only be closed with aclose"""
+        for _, is_async in self._callbacks:
+            if is_async:
+                raise DependencyResolvingException("Asynchronous resources can only be finalized asynchronously")
+
+        callbacks, self._callbacks = self._callbacks, []
+        error: Optional[BaseException] = None
+        for callback, _ in reversed(callbacks):
+            try:
+                callback()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+    async def aclose(self) -> None:
+        """Call synchronous and asynchronous teardown callbacks"""
+        callbacks, self._callbacks = self._callbacks, []
+        error: Optional[BaseException] = None
+        for callback, is_async in reversed(callbacks):
+            try:
+                if is_async:
+                    await callback()
+                else:
+                    callback()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+    def __len__(self) -> int:
+        return len(self._callbacks)
+
+
+def _close_generator(generator: Iterator[Any]) -> None:
+    try:
+        next(generator)
+    except StopIteration:
+        return
+    raise DependencyResolvingException(f"Generator factory {generator} must yield only once")
+
+
+async def _close_async_generator(generator: AsyncIterator[Any]) -> None:
+    try:
+        await generator.__anext__()
+    except StopAsyncIteration:
+        return
+    raise DependencyResolvingException(f"Generator factory {generator} must yield only once")
+
+
+def enter_resource(resource_kind: ResourceKind, resource: Any, finalizers: Finalizers) -> Any:
+    """Get dependency from a synchronous resource, registering its teardown"""
+    if resource_kind == ResourceKind.GENERATOR:
+        dependency = next(resource)
+        finalizers.add(partial(_close_generator, resource))
+        return dependency
+    if resource_kind == ResourceKind.CONTEXT_MANAGER:
+        dependency = resource.__enter__()
+        finalizers.add(partial(resource.__exit__, None, None, None))
+        return dependency
+    raise DependencyResolvingException(f"{resource} is asynchronous, it can only be resolved asynchronously")
+
+
+async def async_enter_resource(resource_kind: ResourceKind, resource: Any, finalizers: Finalizers) -> Any:
+    """Get dependency from a resource, registering its teardown"""
+    if resource_kind == ResourceKind.ASYNC_GENERATOR:
+        dependency = await resource.__anext__()
+        finalizers.add(partial(_close_async_generator, resource), is_async=True)
+        return dependency
+    if resource_kind == ResourceKind.ASYNC_CONTEXT_MANAGER:
+        dependency = await resource.__aenter__()
+        finalizers.add(partial(resource.__aexit__, None, None, None), is_async=True)
+        return dependency
+    return enter_resource(resource_kind, resource, finalizers)
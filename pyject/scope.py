@@ -0,0 +1,56 @@
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Optional
+
+from pyject.resources import Finalizers
+from pyject.utils import reset_context_var
+
+
+class DependencyScope:
+    """Storage of context scoped dependencies that lives until the scope is exited"""
+
+    __slots__ = ("dependencies", "is_implicit", "_finalizers", "_storage", "_token")
+
+    def __init__(self, storage: ContextVar, finalizers: Optional[Finalizers] = None) -> None:
+        self.dependencies: Dict[int, Any] = {}
+        # implicit scopes hold dependencies resolved outside of scopes and share finalizers of the container
+        self.is_implicit = finalizers is not None
+        self._finalizers = finalizers
+        self._storage = storage
+        self._token: Optional[Token] = None
+
+    @property
+    def finalizers(self) -> Finalizers:
+        """Teardown callbacks of resources created in the scope"""
+        finalizers = self._finalizers
+        if finalizers is None:
+            finalizers = Finalizers()
+            self._finalizers = finalizers
+        return finalizers
+
+    def _reset(self) -> Optional[Finalizers]:
+        reset_context_var(self._storage, self._token)  # type: ignore
+        self._token = None
+        # dependencies are released by dropping the whole storage at once
+        self.dependencies = {}
+        finalizers, self._finalizers = self._finalizers, None
+        return finalizers
+
+    def __enter__(self) -> "DependencyScope":
+        self._token = self._storage.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        finalizers = self._reset()
+        if finalizers is not None:
+            finalizers.close()
+
+    async def __aenter__(self) -> "DependencyScope":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        finalizers = self._reset()
+        if finalizers is not None:
+            await finalizers.aclose()
+
+    def __len__(self) -> int:
+        return len(self.dependencies)
@@ -1,7 +1,10 @@
-from typing import Generic, TypeVar, Type, Union, Optional, Any
+from threading import RLock
+from typing import Generic, TypeVar, Type, Union, Optional, Any, Callable, Dict
 
 from pyject.base import IResolver
 from pyject.collections import DependencyStorage
+from pyject.exception import DependencyResolvingException
+from pyject.plan import ResolutionPlan, NOT_FOUND
 
 T = TypeVar("T")
 
@@ -12,10 +15,13 @@ class ForwardRef(Generic[T]):
         self.__dependency_storage = dependency_storage
         self.__instance: Optional[T] = None
         self.__generic_typing: Optional[Type[T]] = None
+        self.__plan: Optional[ResolutionPlan] = None
+        self.__lock = RLock()
         self.__repr_str = f"<class '{self.__module__}.ForwardRef'>"
 
-    def __set_generic_typing(self, generic_typing: Type[T]) -> None:
+    def __set_generic_typing(self, generic_typing: Type[T], plan: Optional[ResolutionPlan] = None) -> None:
         self.__generic_typing = generic_typing
+        self.__plan = plan
         self.__set_metadata(generic_typing)
 
     def __set_instance(self, instance: T) -> None:
@@ -34,13 +40,63 @@ class ForwardRef(Generic[T]):
             self.__qualname__ = qualname
         self.__annotations__ = getattr(instance, '__annotations__', {})
 
+    def __get_instance(self) -> T:
+        instance = self.__instance
+        if instance is not None:
+            return instance
+
+        # the dependency is resolved once even if several threads use the reference for the first time
+        with self.__lock:
+            instance = self.__instance
+            if instance is None:
+                plan = self.__plan
+                if plan is None:
+                    plan = self.__resolver.get_plan(self.__generic_typing)
+                instance = plan.first()
+                if instance is NOT_FOUND:
+                    raise DependencyResolvingException(
+                        f"There is no such dependency in the container {self.__generic_typing}"
+                    )
+                self.__set_instance(instance)
+        return instance
+
     def __repr__(self) -> str:
         return self.__repr_str
 
     def __getattr__(self, item: str) -> Any:
-        if self.__instance is None:
-            for instance in self.__resolver.get_resolved_dependencies(self.__generic_typing):
-                self.__set_instance(instance)
-                break
+        instance = self.__get_instance()
+        value = getattr(instance, item)
+        if _is_method(instance, item, value):
+            # methods are bound the same way on each access, so later calls skip __getattr__
+            self.__dict__[item] = value
+        return value
+
+
+class Provider(Generic[T]):
+    """Callable that creates the dependency for T with precompiled providers of its attributes"""
+
+    __slots__ = ("_get_dependency", "_create")
+
+    def __init__(self, get_dependency: Callable[[], T], create: Callable[[Dict[str, Any]], T]) -> None:
+        self._get_dependency = get_dependency
+        self._create = create
+
+    def __call__(self, **kwargs: Any) -> T:
+        """Get the dependency, or create a new one whose passed keyword arguments replace resolved ones"""
+        if kwargs:
+            return self._create(kwargs)
+        return self._get_dependency()
+
+
+def _is_method(instance: Any, item: str, value: Any) -> bool:
+    if getattr(value, "__self__", None) is not instance or item in getattr(instance, "__dict__", ()):
+        return False
+    class_attribute = getattr(type(instance), item, None)
+    return callable(class_attribute) and not hasattr(class_attribute, "__set__")
+
 
-        return getattr(self.__instance, item)
+def unwrap(dependency: Union[ForwardRef[T], T]) -> T:
+    """Get the object behind a ForwardRef, resolving it on the first call, or the dependency itself"""
+    if isinstance(dependency, ForwardRef):
+        return dependency._ForwardRef__get_instance()  # type: ignore
+    return dependency
@@ -1,5 +1,6 @@
 import inspect
 import sys
+import warnings
 from typing import Any, TypeVar, Type, Iterable, Union, Callable, Awaitable
 import contextvars
 
@@ -81,6 +82,19 @@ def check_union_typing(annotation: Any) -> bool:
     return False
 
 
+def reset_context_var(context_var: contextvars.ContextVar, token: contextvars.Token) -> None:
+    """Restore value that context variable had before token was set, only warn when it was set in another context"""
+    try:
+        context_var.reset(token)
+    except ValueError:
+        # the value lives in the context where it was set, setting the old one here would leak it into this one
+        warnings.warn(
+            f"{context_var.name} was set in another context and cannot be reset from this one",
+            RuntimeWarning,
+            stacklevel=3,
+        )
+
+
 T = TypeVar("T", bound="ContextInstanceMixin")
 
 
@@ -1,6 +1,12 @@
+import gc
 import typing
+import weakref
 
-from pyject.annotations import get_annotations_to_implementation, get_annotations, convert_dict_annotation_to_tuple
+from unittest import mock
+
+from pyject import Container, annotations as annotations_module
+from pyject.annotations import get_annotations_to_implementation, get_annotations, convert_dict_annotation_to_tuple, \
+    SignatureCache, AnnotationKeyCache
 
 
 class BaseTestClass:
@@ -56,3 +62,84 @@ def test_get_annotation_to_implementation():
         for tuple_ in annotations:
             assert isinstance(tuple_, tuple)
             assert isinstance(tuple_[0], str)
+
+
+def test_signature_cache():
+    cache = SignatureCache()
+    instance = BaseTestClass()
+
+    with mock.patch.object(
+        annotations_module, "get_annotations_to_implementation", wraps=get_annotations_to_implementation
+    ) as parser:
+        assert cache.get(BaseTestClass) == get_annotations_to_implementation(BaseTestClass)
+        assert cache.get(BaseTestClass) == get_annotations_to_implementation(BaseTestClass)
+        assert cache.get(instance.test) == get_annotations_to_implementation(instance.test)
+        assert cache.get(BaseTestClass().test) == get_annotations_to_implementation(instance.test)
+        assert cache.get("string") is None
+        assert cache.get(instance) == get_annotations_to_implementation(instance)
+        assert parser.call_count == 4
+    assert len(cache) == 2
+
+    cache.maxsize = 1
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_signature_cache_is_weak():
+    cache = SignatureCache()
+
+    def func(a: str):
+        pass
+
+    cache.get(func)
+    assert len(cache) == 1
+    del func
+    assert len(cache) == 0
+
+
+def test_annotation_key_cache():
+    cache = AnnotationKeyCache()
+    key = cache.get(typing.List[int])
+    assert key == (typing.List[int], (int,))
+    assert cache.get(typing.List[int]) == key
+    assert cache.get(key) is key
+    assert cache.get(BaseTestClass) is BaseTestClass
+    assert cache.get([]) == []
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_annotation_key_cache_is_weak():
+    cache = AnnotationKeyCache()
+
+    class Item:
+        pass
+
+    generic = list[Item]
+    assert cache.get(generic) == (generic, (Item,))
+    assert cache.get(Item) is Item
+    assert len(cache) == 1
+    item_reference = weakref.ref(Item)
+    del generic, Item
+    gc.collect()
+    assert len(cache) == 0
+    assert item_reference() is None
+
+
+def test_container_does_not_keep_annotations():
+    class Item:
+        pass
+
+    container = Container()
+    container.add_transient(Item)
+    container.get(Item)
+    container_reference = weakref.ref(container)
+    item_reference = weakref.ref(Item)
+    del container, Item
+    Container()  # replaces the deleted container as the current one
+    gc.collect()
+    assert container_reference() is None
+    assert item_reference() is None
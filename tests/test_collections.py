@@ -1,10 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
 from typing import Any
 
 from pytest import raises
 
 from pyject import DependencyResolvingException
-from pyject.collections import ConditionCollections
+from pyject.base import BaseCondition
+from pyject.collections import ConditionCollections, DependencyStorage
 from pyject.conditions import AnyCondition, DefaultCondition
+from tests.classes import QuackBehavior, Sqeak, DuckInterface, DuckA, DuckC
 
 
 def test_add_condition(resolver_feick, dependency_storage_feick):
@@ -41,3 +45,65 @@ def test_find(resolver_feick, resolver_feick_2, dependency_storage_feick):
 
     collection = ConditionCollections(resolver_feick_2, dependency_storage_feick, default_condition=DefaultCondition)
     assert collection.find(Any) == "test"
+
+
+def test_get_compatible_dependencies():
+    dependency_storage = DependencyStorage()
+    dependency_storage.add_transient(DuckInterface, DuckA)
+    dependency_storage.add_transient("duck", DuckC)
+
+    assert [wrapper.target for wrapper in dependency_storage.get_compatible_dependencies(DuckC)] == [DuckA]
+    assert list(dependency_storage.get_compatible_dependencies(DuckInterface)) == []
+    assert list(dependency_storage.get_compatible_dependencies(QuackBehavior)) == []
+
+    dependency_storage.add_transient(QuackBehavior, Sqeak)
+    dependency_storage.add_transient(DuckInterface, DuckC)
+    assert [wrapper.target for wrapper in dependency_storage.get_compatible_dependencies(DuckC)] == [DuckA, DuckC]
+    assert list(dependency_storage.get_compatible_dependencies(QuackBehavior)) == []
+    assert [wrapper.target for wrapper in dependency_storage.get_compatible_dependencies(Sqeak)] == [Sqeak]
+
+
+class StrCondition(BaseCondition):
+    def check_typing(self, typing: Any) -> bool:
+        return typing is str
+
+    def handle(self, typing: Any) -> str:
+        return "str"
+
+
+def test_find_cache(resolver_feick_2, dependency_storage_feick):
+    collection = ConditionCollections(resolver_feick_2, dependency_storage_feick, default_condition=DefaultCondition)
+    assert collection.find(str) == "test"
+    assert collection.find(str) == "test"
+
+    collection.add(StrCondition)
+    assert collection.find(str) == "str"
+    assert collection.find(int) == "test"
+
+
+def test_dependency_wrappers_share_annotations():
+    dependency_storage = DependencyStorage()
+    dependency_storage.add_transient(DuckInterface, DuckA)
+    dependency_storage.add_singleton(DuckInterface, DuckA)
+
+    first, second = dependency_storage.get_dependencies_by_annotation(DuckInterface)
+    assert first.annotations is second.annotations
+    assert not hasattr(first, "__dict__")
+
+
+def test_singleton_lock_is_created_on_first_use():
+    dependency_storage = DependencyStorage()
+    dependency_storage.add_singleton(DuckInterface, DuckA)
+    wrapper, = dependency_storage.get_dependencies_by_annotation(DuckInterface)
+    assert wrapper.lock is None
+
+    barrier = Barrier(8)
+
+    def get_lock():
+        barrier.wait()
+        return wrapper.get_lock()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        locks = list(executor.map(lambda _: get_lock(), range(8)))
+
+    assert all(lock is wrapper.lock for lock in locks)
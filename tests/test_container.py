@@ -1,16 +1,27 @@
-from typing import List, Iterator
+import asyncio
+import gc
+import sys
+import weakref
+from abc import ABC
+from contextlib import contextmanager
+from typing import List, Iterator, AsyncIterator
 
 import pytest
 
-from pyject.exception import DependencyNotFound, DependencyResolvingException
+from pyject.base import BaseCondition, IContainer
+from pyject.exception import DependencyNotFound, DependencyResolvingException, ContainerFrozenException
 
 from pytest import fixture, raises
 
-from pyject.container import Container
-from pyject.types import ForwardRef
+from pyject.container import Container, FrozenContainer, inject
+from pyject.models import LazyImport
+from pyject.types import ForwardRef, Provider, unwrap
 from tests.classes import QuackBehavior, Sqeak, DuckInterface, DuckA, DuckB, DuckC, duck_d, Test1, Test2, \
     GenericDuckInterface, DuckA2, DuckB2
+from concurrent.futures import ThreadPoolExecutor
 from contextvars import copy_context
+from threading import Barrier
+from time import sleep
 from unittest import mock
 
 
@@ -85,6 +96,31 @@ def test_getting_all_obj_from_container(container_with_transient_classes, contai
         assert isinstance(duck, DuckInterface)
 
 
+def test_iter_all(container):
+    created = []
+
+    def create_duck(squeak: QuackBehavior) -> DuckInterface:
+        created.append(squeak)
+        return DuckA(squeak)
+
+    container.add_transient(QuackBehavior, Sqeak)
+    container.add_transient(DuckA, create_duck)
+    container.add_transient(DuckA, create_duck)
+    container.add_transient(DuckInterface, DuckC)
+
+    ducks = container.iter_all(DuckA)
+    assert created == []
+    assert isinstance(next(ducks), DuckA)
+    assert len(created) == 1
+    assert [type(duck) for duck in ducks] == [DuckA, DuckC]
+    assert len(created) == 2
+
+    assert len(container.get_all(DuckA, limit=1)) == 1
+    assert len(created) == 3
+    assert [type(duck) for duck in container.get_all(DuckA, limit=5)] == [DuckA, DuckA, DuckC]
+    assert list(container.iter_all(Test1)) == []
+
+
 def test_transient_obj(container_with_transient_classes):
     duck_1 = container_with_transient_classes.get(DuckInterface)
     duck_2 = container_with_transient_classes.get(DuckInterface)
@@ -214,6 +250,87 @@ def test_override(container_with_singleton_classes):
             pass
 
 
+def test_override_invalidates_only_dependents(container_with_singleton_classes):
+    container = container_with_singleton_classes
+    container.add_singleton(Test2)
+
+    class Pond:
+        def __init__(self, ducks: List[DuckInterface]):
+            self.ducks = ducks
+
+    container.add_singleton(Pond)
+    pond = container.get(Pond)
+    duck = container.get(DuckInterface)
+    test2 = container.get(Test2)
+
+    sqeak_mock: Sqeak = mock.Mock(spec=Sqeak)
+    with container.override(QuackBehavior, sqeak_mock):
+        assert container.get(Test2) is test2
+        assert container.get(DuckInterface) is not duck
+        assert container.get(Pond) is not pond
+        assert container.get(Pond).ducks[0]._quack_behavior is sqeak_mock
+
+    assert container.get(DuckInterface) is duck
+    assert container.get(Pond) is pond
+
+    def get_quack_behavior(test2: Test2) -> QuackBehavior:
+        return test2
+
+    with container.override(QuackBehavior, factory=get_quack_behavior):
+        overridden_duck = container.get(DuckInterface)
+        with container.override(Test2, sqeak_mock):
+            assert container.get(DuckInterface) is not overridden_duck
+            assert container.get(DuckInterface)._quack_behavior is sqeak_mock
+        assert container.get(DuckInterface) is overridden_duck
+    assert container.get(Pond) is pond
+
+
+def test_override_is_context_local(container_with_singleton_classes):
+    container = container_with_singleton_classes
+    duck = container.get(DuckInterface)
+    sqeak_mock: Sqeak = mock.Mock(spec=Sqeak)
+    overridden = Barrier(2)
+    checked = Barrier(2)
+
+    def override():
+        with container.override(QuackBehavior, sqeak_mock):
+            overridden.wait()
+            checked.wait()
+            return container.get(DuckInterface)._quack_behavior
+
+    def check():
+        overridden.wait()
+        try:
+            return container.get(DuckInterface)
+        finally:
+            checked.wait()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        overridden_quack_behavior = executor.submit(override)
+        other_duck = executor.submit(check)
+    assert overridden_quack_behavior.result() is sqeak_mock
+    assert other_duck.result() is duck
+    assert container.get(DuckInterface) is duck
+
+
+@pytest.mark.asyncio
+async def test_override_is_task_local(container_with_singleton_classes):
+    container = container_with_singleton_classes
+    duck = await container.async_get(DuckInterface)
+    sqeak_mock: Sqeak = mock.Mock(spec=Sqeak)
+
+    async def override():
+        with container.override(QuackBehavior, sqeak_mock):
+            await asyncio.sleep(0.01)
+            return (await container.async_get(DuckInterface))._quack_behavior
+
+    async def check():
+        await asyncio.sleep(0.005)
+        return await container.async_get(DuckInterface)
+
+    assert await asyncio.gather(override(), check()) == [sqeak_mock, duck]
+
+
 def test_circular_dependency(container):
     container.add_singleton(Test1, Test1)
     container.add_singleton(Test2, Test2)
@@ -226,6 +343,32 @@ def test_circular_dependency(container):
     assert test1.test1() == test1.test2.test2()
 
 
+def test_forward_ref_proxy(container):
+    container.add_transient(Test1, Test1)
+    test1 = container.get(Test1)
+    with raises(DependencyResolvingException):
+        test1.test1()
+
+    container.add_transient(Test2, Test2)
+    test1 = container.get(Test1)
+    started = Barrier(4)
+
+    def get_test2(_):
+        started.wait()
+        return unwrap(test1.test2)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        instances = list(executor.map(get_test2, range(4)))
+    assert all(instance is instances[0] for instance in instances)
+    assert isinstance(instances[0], Test2)
+    assert unwrap(instances[0]) is instances[0]
+
+    assert test1.test1() == "123"
+    assert "test2" in vars(test1.test2)
+    assert isinstance(test1.test2.test1, ForwardRef)
+    assert "test1" not in vars(test1.test2)
+
+
 def test_generic_dependency(container):
     container.add_singleton(QuackBehavior, Sqeak)
     container.add_transient(GenericDuckInterface[int], DuckA2)
@@ -236,3 +379,784 @@ def test_generic_dependency(container):
 
     assert isinstance(container.get(GenericDuckInterface[str]), DuckB2)
     assert isinstance(container.get(GenericDuckInterface[str]), GenericDuckInterface)
+
+    duck = DuckB2(Sqeak())
+    with container.override(GenericDuckInterface[int], duck):
+        assert container.get(GenericDuckInterface[int]) is duck
+        assert container.get_all(GenericDuckInterface[int]) == [duck]
+    assert isinstance(container.get(GenericDuckInterface[int]), DuckA2)
+
+
+def test_plan_invalidation(container):
+    with raises(DependencyNotFound):
+        container.get(QuackBehavior)
+
+    container.add_transient(DuckInterface, DuckA)
+    with raises(DependencyResolvingException):
+        container.get(DuckInterface)
+
+    container.add_singleton(QuackBehavior, Sqeak)
+    assert isinstance(container.get(DuckInterface), DuckA)
+    assert container.get(DuckInterface).quack() is None
+
+    sqeak_mock: Sqeak = mock.Mock(spec=Sqeak)
+    sqeak_mock.quack.return_value = "123"
+    with container.override(QuackBehavior, sqeak_mock):
+        assert container.get(DuckInterface).quack() == "123"
+    assert container.get(DuckInterface).quack() is None
+
+
+def test_inject(container_with_transient_classes: Container):
+    @container_with_transient_classes.inject
+    def test_func(name: str, duck: DuckInterface, quack: QuackBehavior):
+        return name, duck, quack
+
+    name, duck, quack = test_func("duck")
+    assert name == "duck"
+    assert isinstance(duck, DuckA)
+    assert isinstance(quack, Sqeak)
+
+    duck_c = DuckC()
+    name, duck, quack = test_func("duck", duck=duck_c)
+    assert duck is duck_c
+    assert isinstance(quack, Sqeak)
+
+    name, duck, quack = test_func("duck", duck_c, quack=None)
+    assert duck is duck_c
+    assert quack is None
+
+    assert test_func.__name__ == "test_func"
+
+
+def test_inject_defaults(container_with_transient_classes: Container):
+    @container_with_transient_classes.inject
+    def test_func(duck: DuckInterface, retries: int = 3):
+        return duck, retries
+
+    duck, retries = test_func()
+    assert isinstance(duck, DuckA)
+    assert retries == 3
+    assert test_func(retries=5)[1] == 5
+
+    @container_with_transient_classes.inject
+    async def async_test_func(duck: DuckInterface, retries: int = 3):
+        return duck, retries
+
+    assert asyncio.run(async_test_func())[1] == 3
+
+
+def test_inject_current_container(container_with_transient_classes: Container):
+    @inject
+    def test_func(duck: DuckInterface):
+        return duck
+
+    assert isinstance(test_func(), DuckA)
+    container_with_transient_classes.add_transient(QuackBehavior, Sqeak)
+    assert isinstance(test_func(), DuckA)
+
+
+@pytest.mark.asyncio
+async def test_async_inject(container_with_transient_classes: Container):
+    @container_with_transient_classes.inject
+    async def test_func(duck: DuckInterface):
+        return duck
+
+    assert isinstance(await test_func(), DuckA)
+    duck_c = DuckC()
+    assert await test_func(duck_c) is duck_c
+
+
+def test_freeze(container_with_singleton_classes: Container):
+    container_with_singleton_classes.add_transient(GenericDuckInterface[int], DuckA2)
+    frozen_container = container_with_singleton_classes.freeze()
+    assert isinstance(frozen_container, FrozenContainer)
+    assert frozen_container.freeze() is frozen_container
+    assert Container.get_current() is frozen_container
+    assert frozen_container.get(Container) is frozen_container
+
+    assert frozen_container.get(DuckInterface) is frozen_container.get(DuckInterface)
+    assert frozen_container.get(DuckInterface) is not container_with_singleton_classes.get(DuckInterface)
+    assert [type(duck) for duck in frozen_container.get_all(DuckInterface)] == [
+        type(duck) for duck in container_with_singleton_classes.get_all(DuckInterface)
+    ]
+    assert isinstance(frozen_container.get(GenericDuckInterface[int]), DuckA2)
+    assert isinstance(frozen_container.get(Sqeak), Sqeak)
+
+    with raises(ContainerFrozenException):
+        frozen_container.add_transient(DuckInterface, DuckC)
+
+    container_with_singleton_classes.add_transient(Test1, Test1)
+    with raises(DependencyNotFound):
+        frozen_container.get(Test1)
+
+
+def test_freeze_override(container_with_singleton_classes: Container):
+    frozen_container = container_with_singleton_classes.freeze()
+    duck = frozen_container.get(DuckInterface)
+
+    sqeak_mock: Sqeak = mock.Mock(spec=Sqeak)
+    sqeak_mock.quack.return_value = "123"
+    with frozen_container.override(QuackBehavior, sqeak_mock):
+        assert frozen_container.get(DuckInterface).quack() == "123"
+        assert container_with_singleton_classes.get(QuackBehavior) is not sqeak_mock
+
+    assert frozen_container.get(QuackBehavior) is not sqeak_mock
+    assert frozen_container.get(DuckInterface) is duck
+
+
+def test_override_exited_in_another_context(container_with_singleton_classes: Container):
+    container = container_with_singleton_classes
+    sqeak = Sqeak()
+
+    async def fixture():
+        with container.override(QuackBehavior, sqeak):
+            async with container.scope():
+                yield container.get(QuackBehavior)
+
+    # pytest-asyncio runs each step of an async generator fixture in its own task
+    generator = fixture()
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(generator.__anext__()) is sqeak
+        with pytest.warns(RuntimeWarning, match="another context"):
+            with raises(StopAsyncIteration):
+                loop.run_until_complete(generator.__anext__())
+    finally:
+        loop.close()
+    assert container.get(QuackBehavior) is not sqeak
+
+
+def test_freeze_copies_dependencies(container_with_singleton_classes: Container):
+    container = container_with_singleton_classes
+    frozen_container = container.freeze()
+    duck = container.get(DuckInterface)
+    frozen_duck = frozen_container.get(DuckInterface)
+    assert frozen_duck is not duck
+
+    sqeak = Sqeak()
+    frozen_container.override(QuackBehavior, sqeak)()
+    assert frozen_container.get(DuckInterface)._quack_behavior is sqeak
+    assert container.get(DuckInterface) is duck
+    assert container.get(DuckInterface)._quack_behavior is not sqeak
+
+    frozen_duck = frozen_container.get(DuckInterface)
+    container.close()
+    assert container.get(DuckInterface) is not duck
+    assert frozen_container.get(DuckInterface) is frozen_duck
+    frozen_container.close()
+    assert frozen_container.get(DuckInterface) is not frozen_duck
+
+
+def test_override_recreates_singletons_with_lazy_attributes(container):
+    class Leaf:
+        pass
+
+    class FirstLeaf:
+        pass
+
+    class Holder:
+        def __init__(self, leaves: Iterator[Leaf], leaf: ForwardRef[Leaf], named: FirstLeaf):
+            self.leaves = list(leaves)
+            self.leaf = leaf
+            self.named = named
+
+    class NamedCondition(BaseCondition):
+        def check_typing(self, typing):
+            return typing is FirstLeaf
+
+        def handle(self, typing):
+            return self._resolver.get_plan(Leaf).first()
+
+    container._resolver._condition_collections.add(NamedCondition)
+    container.add_singleton(Leaf)
+    container.add_singleton(Holder)
+    holder = container.get(Holder)
+    assert type(holder.leaves[0]) is Leaf
+
+    leaf = Leaf()
+    with container.override(Leaf, leaf):
+        overridden_holder = container.get(Holder)
+        assert overridden_holder.leaves == [leaf]
+        assert unwrap(overridden_holder.leaf) is leaf
+        assert overridden_holder.named is leaf
+    assert container.get(Holder) is holder
+
+    container.override(Leaf, leaf)()
+    assert container.get(Holder).leaves == [leaf]
+
+
+def test_override_recreates_singletons_with_virtual_subclasses(container):
+    class Base(ABC):
+        pass
+
+    class Implementation:
+        pass
+
+    class Holder:
+        def __init__(self, implementation: Implementation):
+            self.implementation = implementation
+
+    Base.register(Implementation)
+    container.add_singleton(Base, Implementation)
+    container.add_singleton(Holder)
+    holder = container.get(Holder)
+
+    implementation = Implementation()
+    with container.override(Base, implementation):
+        assert container.get(Holder).implementation is implementation
+    assert container.get(Holder) is holder
+
+
+def test_freeze_validation(container):
+    container.add_transient(DuckInterface, DuckA)
+    with raises(DependencyResolvingException):
+        container.freeze()
+
+
+def test_singleton_is_created_once_in_threads(container):
+    created = []
+    barrier = Barrier(8)
+
+    class Slow:
+        def __init__(self):
+            created.append(self)
+            sleep(0.01)
+
+    container.add_singleton(Slow, Slow)
+
+    def get_slow():
+        barrier.wait()
+        return container.get(Slow)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        instances = list(executor.map(lambda _: get_slow(), range(8)))
+
+    assert len(created) == 1
+    assert all(instance is created[0] for instance in instances)
+
+
+@pytest.mark.asyncio
+async def test_async_get(container):
+    created = []
+
+    class Session:
+        pass
+
+    async def create_session() -> Session:
+        await asyncio.sleep(0.01)
+        session = Session()
+        created.append(session)
+        return session
+
+    async def create_quack_behavior(session: Session) -> QuackBehavior:
+        await asyncio.sleep(0.01)
+        return Sqeak()
+
+    container.add_singleton(Session, create_session)
+    container.add_transient(QuackBehavior, create_quack_behavior)
+    container.add_transient(DuckInterface, DuckA)
+    container.add_transient(DuckInterface, DuckC)
+
+    sessions = await asyncio.gather(*[container.async_get(Session) for _ in range(5)])
+    assert len(created) == 1
+    assert all(session is created[0] for session in sessions)
+
+    duck = await container.async_get(DuckInterface)
+    assert isinstance(duck, DuckA)
+    assert isinstance(duck._quack_behavior, Sqeak)
+
+    ducks = await container.async_get_all(DuckInterface)
+    assert [duck.__class__ for duck in ducks] == [DuckA, DuckC]
+
+    async def test(duck: DuckInterface, session: Session):
+        return duck, session
+
+    duck, session = await container.async_resolve(test)
+    assert isinstance(duck, DuckA)
+    assert session is created[0]
+
+    with raises(DependencyResolvingException):
+        container.get(DuckInterface)
+
+    with raises(DependencyNotFound):
+        await container.async_get(Test1)
+
+
+@pytest.mark.asyncio
+async def test_async_get_resolves_siblings_concurrently(container):
+    class First:
+        pass
+
+    class Second:
+        pass
+
+    first_started = asyncio.Event()
+    second_started = asyncio.Event()
+
+    # each factory waits for the other one to start, so resolving them one by one never completes
+    async def create_first() -> First:
+        first_started.set()
+        await second_started.wait()
+        return First()
+
+    async def create_second() -> Second:
+        second_started.set()
+        await first_started.wait()
+        return Second()
+
+    def create_pair(first: First, second: Second):
+        return first, second
+
+    container.add_transient(First, create_first)
+    container.add_transient(Second, create_second)
+    container.add_transient("pair", create_pair)
+
+    first, second = await asyncio.wait_for(container.async_get("pair"), timeout=1)
+    assert isinstance(first, First)
+    assert isinstance(second, Second)
+
+
+def test_warmup(container_with_singleton_classes: Container):
+    container_with_singleton_classes.add_transient(Test1, Test1)
+    timings = container_with_singleton_classes.warmup(max_workers=2)
+
+    assert [timing.target for timing in timings][0] == Sqeak
+    assert {timing.target for timing in timings} == {Sqeak, DuckA, DuckB, DuckC}
+    assert all(timing.seconds >= 0 for timing in timings)
+
+    ducks = container_with_singleton_classes.get_all(DuckInterface)
+    assert ducks[0]._quack_behavior is container_with_singleton_classes.get(QuackBehavior)
+    assert container_with_singleton_classes.warmup() == []
+
+
+@pytest.mark.asyncio
+async def test_async_warmup(container):
+    async def create_quack_behavior() -> QuackBehavior:
+        return Sqeak()
+
+    container.add_singleton(QuackBehavior, create_quack_behavior)
+    container.add_singleton(DuckInterface, DuckA)
+    container.add_singleton(DuckInterface, DuckC)
+
+    assert [timing.target for timing in container.warmup()] == [DuckC]
+
+    timings = await container.async_warmup()
+    assert [timing.target for timing in timings] == [create_quack_behavior, DuckA]
+    assert container.get(DuckInterface)._quack_behavior is container.get(QuackBehavior)
+
+
+def test_lazy_container():
+    namespace = {}
+    exec("class Service:\n    def __init__(self, repository: 'Repository'):\n        self.repository = repository", namespace)
+    service_class = namespace["Service"]
+
+    with raises(NameError):
+        Container().add_transient(service_class)
+
+    container = Container(is_lazy=True)
+    container.add_transient(service_class)
+    container.add_transient(DuckInterface, DuckA)
+    with raises(NameError):
+        container.get(service_class)
+
+    exec("class Repository:\n    pass", namespace)
+    container.add_singleton(namespace["Repository"])
+    assert isinstance(container.get(service_class).repository, namespace["Repository"])
+
+    with raises(DependencyResolvingException):
+        container.freeze()
+
+    exec("class Recursive:\n    def __init__(self, recursive: 'Recursive'):\n        pass", namespace)
+    container.add_transient(namespace["Recursive"])
+    with raises(Exception, match="itself"):
+        container.get(namespace["Recursive"])
+
+
+def test_lazy_import(tmp_path, monkeypatch):
+    (tmp_path / "lazy_ducks.py").write_text(
+        "from tests.classes import DuckInterface, QuackBehavior\n\n\n"
+        "class LazyDuck(DuckInterface):\n"
+        "    def __init__(self, quack_behavior: QuackBehavior):\n"
+        "        self._quack_behavior = quack_behavior\n\n"
+        "    def quack(self):\n"
+        "        return self._quack_behavior.quack()\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_ducks", raising=False)
+
+    container = Container()
+    container.add_transient(QuackBehavior, Sqeak)
+    container.add_singleton(DuckInterface, "lazy_ducks:LazyDuck")
+    container.add_transient(DuckInterface, DuckA)
+    with container.override(QuackBehavior, Sqeak()):
+        pass
+    assert "lazy_ducks" not in sys.modules
+
+    duck = container.get(DuckInterface)
+    assert "lazy_ducks" in sys.modules
+    assert duck.__class__.__name__ == "LazyDuck"
+    assert isinstance(duck._quack_behavior, Sqeak)
+    assert duck is container.get(DuckInterface)
+    assert len(container.get_all(DuckInterface)) == 2
+
+    container.add_transient(LazyImport("lazy_ducks:Missing"))
+    with raises(AttributeError):
+        container.get(LazyImport("lazy_ducks:Missing"))
+
+    with raises(ValueError):
+        LazyImport("lazy_ducks.LazyDuck")
+
+
+def test_scope(container):
+    container.add_context(QuackBehavior, Sqeak)
+    container.add_context(DuckInterface, DuckA)
+    outer_quack_behavior = container.get(QuackBehavior)
+
+    with container.scope() as scope:
+        duck = container.get(DuckInterface)
+        assert duck is container.get(DuckInterface)
+        assert duck._quack_behavior is container.get(QuackBehavior)
+        assert duck._quack_behavior is not outer_quack_behavior
+        assert len(scope) == 2
+
+        with container.scope():
+            assert container.get(DuckInterface) is not duck
+
+        assert container.get(DuckInterface) is duck
+
+    assert len(scope) == 0
+    assert container.get(QuackBehavior) is outer_quack_behavior
+
+
+@pytest.mark.asyncio
+async def test_async_scope(container):
+    container.add_context(QuackBehavior, Sqeak)
+
+    async with container.scope():
+        quack_behaviors = await asyncio.gather(*[container.async_get(QuackBehavior) for _ in range(3)])
+        assert all(quack_behavior is quack_behaviors[0] for quack_behavior in quack_behaviors)
+
+    async with container.scope():
+        assert await container.async_get(QuackBehavior) is not quack_behaviors[0]
+
+
+def test_resource_factories(container):
+    events = []
+
+    class Connection:
+        pass
+
+    def connection(quack_behavior: QuackBehavior) -> Iterator[Connection]:
+        events.append("open connection")
+        yield Connection()
+        events.append("close connection")
+
+    class Session:
+        def __init__(self, connection: Connection):
+            self.connection = connection
+
+        def __enter__(self):
+            events.append("open session")
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            events.append("close session")
+
+    @contextmanager
+    def session(connection: Connection) -> Iterator[Session]:
+        with Session(connection) as entered:
+            yield entered
+
+    class Client:
+        def __enter__(self):
+            events.append("open client")
+            return "entered"
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            events.append("close client")
+
+    @contextmanager
+    def pool() -> Iterator[str]:
+        events.append("open pool")
+        yield "pool"
+        events.append("close pool")
+
+    container.add_transient(QuackBehavior, Sqeak)
+    container.add_transient(Connection, connection)
+    container.add_context(Session, session)
+    container.add_singleton("pool", pool)
+    container.add_transient(Client)
+
+    with container.scope():
+        session = container.get(Session)
+        assert isinstance(session.connection, Connection)
+        assert container.get(Session) is session
+        assert container.get("pool") == "pool"
+        assert isinstance(container.get(Client), Client)
+    assert events == ["open connection", "open session", "open pool", "close session", "close connection"]
+
+    with raises(DependencyResolvingException):
+        container.get(Connection)
+    assert events.count("open connection") == 1
+
+    with raises(DependencyResolvingException):
+        container.get(Session)
+
+    def channel() -> Iterator[List[str]]:
+        events.append("open channel")
+        yield ["channel"]
+        events.append("close channel")
+
+    container.add_context("channel", channel)
+    opened_channel = container.get("channel")
+    assert container.get("channel") is opened_channel
+    container.close()
+    assert events[-2:] == ["close channel", "close pool"]
+    assert container.get("pool") == "pool"
+    assert events[-1] == "open pool"
+    assert container.get("channel") is not opened_channel
+    assert events.count("open channel") == 2
+
+
+@pytest.mark.asyncio
+async def test_async_resource_factories(container):
+    events = []
+
+    async def connection() -> AsyncIterator[str]:
+        events.append("open")
+        yield "connection"
+        events.append("close")
+
+    container.add_context("connection", connection)
+    with raises(DependencyResolvingException):
+        container.get("connection")
+
+    async with container.scope():
+        connections = await asyncio.gather(*[container.async_get("connection") for _ in range(2)])
+        assert connections == ["connection", "connection"]
+        assert events.count("close") == 0
+    assert events.count("open") == events.count("close")
+
+    await container.async_get("connection")
+    with raises(DependencyResolvingException):
+        container.close()
+    await container.aclose()
+    assert events.count("open") == events.count("close")
+    await container.async_get("connection")
+    assert events.count("open") == events.count("close") + 1
+
+
+def test_stats(container_with_singleton_classes):
+    container = container_with_singleton_classes
+    container.add_transient(Test1, Test1)
+    container.get(Test1)
+    assert container.stats() == []
+
+    container.enable_stats()
+    container.get(DuckInterface)
+    container.get(DuckInterface)
+    container.get(Test1)
+    stats = {(stats.type_, stats.target): stats for stats in container.stats()}
+    assert stats[(DuckInterface, DuckA)].count == 1
+    assert stats[(DuckInterface, DuckA)].cache_hits == 1
+    assert stats[(Test1, Test1)].count == 1
+    assert stats[(Test1, Test1)].max_seconds <= stats[(Test1, Test1)].total_seconds
+
+    frozen_container = container.freeze()
+    frozen_container.enable_stats()
+    frozen_container.get(DuckInterface)
+    frozen_container.get(DuckInterface)
+    stats = {(stats.type_, stats.target): stats for stats in frozen_container.stats()}
+    assert stats[(DuckInterface, DuckA)].count == 1
+    assert stats[(DuckInterface, DuckA)].cache_hits == 1
+
+    container.enable_stats(False)
+    container.get(Test1)
+    assert container.stats() == []
+
+
+def test_child_container(container_with_singleton_classes):
+    container = container_with_singleton_classes
+    container.add_transient("duck", duck_d)
+    child = container.create_child()
+    assert child.get(Container) is child
+    assert container.get(Container) is container
+    assert child.get_all(DuckInterface) == container.get_all(DuckInterface)
+    assert child.get(DuckInterface) is container.get(DuckInterface)
+
+    sqeak = Sqeak()
+    child.add_constant(QuackBehavior, sqeak)
+    assert child.get(QuackBehavior) is sqeak
+    assert container.get(QuackBehavior) is not sqeak
+    assert child.get(DuckInterface) is container.get(DuckInterface)
+    assert child.get("duck")._quack_behavior is sqeak
+
+    child.add_transient(DuckInterface, DuckC)
+    assert isinstance(child.get(DuckInterface), DuckC)
+    assert len(child.get_all(DuckInterface)) == 1
+    assert isinstance(container.get(DuckInterface), DuckA)
+
+    with raises(DependencyNotFound):
+        child.get("constant")
+    container.add_constant("constant", 1)
+    assert child.get("constant") == 1
+
+    grandchild = child.create_child()
+    assert grandchild.get("duck")._quack_behavior is sqeak
+    sqeak_mock: Sqeak = mock.Mock(spec=Sqeak)
+    with grandchild.override("constant", 2):
+        assert grandchild.get("constant") == 2
+        assert child.get("constant") == 1
+    with container.override(QuackBehavior, sqeak_mock):
+        assert container.get(DuckInterface)._quack_behavior is sqeak_mock
+        assert grandchild.get(QuackBehavior) is sqeak
+
+    child_reference = weakref.ref(grandchild)
+    del grandchild
+    gc.collect()
+    assert child_reference() is None
+
+
+@pytest.mark.asyncio
+async def test_child_containers_keep_context(container_with_singleton_classes):
+    container = container_with_singleton_classes
+
+    class Pond:
+        def __init__(self, duck: DuckInterface, ducks: List[DuckInterface]):
+            self.ducks = ducks
+
+    container.add_transient(Pond)
+    await container.async_get(Pond)
+    context_size = len(copy_context())
+    for _ in range(100):
+        await container.create_child().async_get(Pond)
+    assert len(copy_context()) == context_size
+
+    class Session:
+        pass
+
+    class Handler:
+        def __init__(self, session: Session, duck: DuckInterface):
+            self.session = session
+
+    container.add_context(Session)
+    container.add_transient(Handler)
+    child = container.create_child()
+    handler = await child.async_get(Handler)
+    assert len(copy_context()) == context_size + 1
+    assert (await child.async_get(Handler)).session is handler.session
+
+
+def test_codegen(container_with_singleton_classes):
+    container = container_with_singleton_classes
+
+    class Pond:
+        def __init__(self, duck: DuckInterface, ducks: List[DuckInterface], test: Test1):
+            self.duck = duck
+            self.ducks = ducks
+
+    container.add_transient(Pond)
+    container.add_transient(Test1)
+    container.add_transient(Test2)
+    duck = container.get(DuckInterface)
+    assert container.get_source(Pond) is None
+
+    container.enable_codegen()
+    pond = container.get(Pond)
+    assert pond.duck is duck
+    assert container.get(Pond) is not pond
+    source = container.get_source(Pond)
+    assert source.startswith("def create_Pond():")
+    assert "test=target_" in source
+
+    container.close()
+    assert container.get(Pond).duck is not duck
+    sqeak_mock: Sqeak = mock.Mock(spec=Sqeak)
+    with container.override(QuackBehavior, sqeak_mock):
+        assert container.get(Pond).duck._quack_behavior is sqeak_mock
+    assert container.get(Pond).duck is container.get(DuckInterface)
+
+    frozen_container = container.freeze()
+    frozen_container.enable_codegen()
+    assert frozen_container.get(Pond).duck is frozen_container.get(DuckInterface)
+    assert frozen_container.get(Pond).duck is not container.get(DuckInterface)
+    frozen_container.close()
+    assert frozen_container.get(Pond).duck is frozen_container.get(DuckInterface)
+
+    container.enable_codegen(False)
+    assert container.get_source(Pond) is None
+
+
+def test_provider(container_with_singleton_classes):
+    container = container_with_singleton_classes
+
+    class Handler:
+        def __init__(self, duck: DuckInterface, message: str = "", ducks: List[DuckInterface] = None):
+            self.duck = duck
+            self.message = message
+
+    class Worker:
+        def __init__(self, create_handler: Provider[Handler]):
+            self.create_handler = create_handler
+
+    container.add_transient(Handler)
+    container.add_singleton(Worker)
+    container.add_constant(str, "default")
+
+    worker = container.get(Worker)
+    handler = worker.create_handler()
+    assert isinstance(handler, Handler)
+    assert handler.message == "default"
+    assert worker.create_handler() is not handler
+    assert worker.create_handler().duck is handler.duck is container.get(DuckInterface)
+
+    duck = DuckC()
+    handler = worker.create_handler(message="hello", duck=duck)
+    assert handler.message == "hello"
+    assert handler.duck is duck
+    assert worker.create_handler(message="world").duck is container.get(DuckInterface)
+
+    handler_mock = mock.Mock(spec=Handler)
+    with container.override(Handler, handler_mock):
+        assert container.get(Worker).create_handler() is handler_mock
+    assert isinstance(container.get(Worker).create_handler(), Handler)
+
+    class Pond:
+        def __init__(self, create_test: Provider[Test1]):
+            self.create_test = create_test
+
+    container.add_transient(Pond)
+    with raises(DependencyResolvingException):
+        container.freeze()
+
+
+def test_container_interface_requires_only_original_methods():
+    class DictContainer(IContainer):
+        def __init__(self):
+            self._dependencies = {}
+
+        def add_singleton(self, annotation, implementation):
+            self._dependencies[annotation] = implementation
+
+        add_constant = add_transient = add_context = add_singleton
+
+        def get(self, annotation):
+            return self._dependencies[annotation]
+
+        def get_all(self, annotation, limit=None):
+            return [self._dependencies[annotation]]
+
+        def get_target_attributes(self, target):
+            return None
+
+        def resolve(self, target):
+            return target()
+
+        async def async_resolve(self, target):
+            return await target()
+
+    container = DictContainer()
+    container.add_constant(QuackBehavior, Sqeak)
+    assert container.get(QuackBehavior) is Sqeak
+    with raises(NotImplementedError):
+        container.create_child()
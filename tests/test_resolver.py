@@ -2,7 +2,7 @@ import typing
 from pytest import fixture
 
 from pyject import Scope
-from pyject.collections import DependencyStorage
+from pyject.collections import DependencyStorage, ChildDependencyStorage
 from pyject.resolver import Resolver
 from tests.classes import QuackBehavior, Sqeak, DuckInterface, DuckA, DuckB, DuckC
 
@@ -39,3 +39,70 @@ def test_get_implementation_attr(resolver):
 
     attrs = resolver.get_implementation_attr(tuple())
     assert isinstance(attrs, dict) is True
+
+
+def test_get_plan(resolver, dependency_storage):
+    plan = resolver.get_plan(DuckInterface)
+    assert resolver.get_plan(DuckInterface) is plan
+    assert len(plan) == 3
+
+    for duck in plan:
+        assert isinstance(duck, DuckInterface)
+
+    dependency_storage.add_transient(DuckInterface, DuckC)
+    new_plan = resolver.get_plan(DuckInterface)
+    assert new_plan is not plan
+    assert len(new_plan) == 4
+
+
+def test_add_dependency_drops_plans_lazily(resolver, dependency_storage):
+    notifications = []
+    dependency_storage.subscribe(lambda: notifications.append(True))
+    plan = resolver.get_plan(DuckInterface)
+
+    dependency_storage.add_transient(DuckInterface, DuckC)
+    assert not notifications
+    assert resolver.get_plan(DuckInterface) is not plan
+
+
+def test_child_plans_are_dropped_by_parent_dependencies(resolver, dependency_storage):
+    child_storage = ChildDependencyStorage(dependency_storage)
+    child_resolver = Resolver(child_storage, resolver)
+    plan = child_resolver.get_plan(DuckInterface)
+    assert len(plan) == 3
+
+    dependency_storage.add_transient(DuckInterface, DuckC)
+    assert len(child_resolver.get_plan(DuckInterface)) == 4
+
+
+def test_clear_plans(resolver):
+    plan = resolver.get_plan(QuackBehavior)
+    resolver.clear_plans()
+    assert resolver.get_plan(QuackBehavior) is not plan
+
+
+def test_get_dependents(resolver, dependency_storage):
+    class Pond:
+        def __init__(self, duck: DuckInterface):
+            self.duck = duck
+
+    class Sqeaker:
+        def __init__(self, sqeak: Sqeak):
+            self.sqeak = sqeak
+
+    class Unrelated:
+        def __init__(self, name: "str"):
+            self.name = name
+
+    dependency_storage.add_transient(Pond, Pond)
+    dependency_storage.add_transient(Sqeaker, Sqeaker)
+    dependency_storage.add_transient(Unrelated, Unrelated)
+
+    dependents = [wrapper.target for wrapper in resolver.get_dependents(QuackBehavior)]
+    assert set(dependents) == {DuckA, DuckB, Pond, Sqeaker}
+    assert [wrapper.target for wrapper in resolver.get_dependents(DuckInterface)] == [Pond]
+    assert resolver.get_dependents(Pond) == []
+
+    assert resolver.get_dependents(QuackBehavior) is resolver.get_dependents(QuackBehavior)
+    dependency_storage.add_singleton(DuckInterface, DuckB)
+    assert len(resolver.get_dependents(QuackBehavior)) == len(dependents) + 1